@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+GPS Verifier Batch Audit - Offline re-validation of stored images and coordinate logs
+Runs GPSExtractor and LocationValidator directly over a directory tree, a zip file
+or a CSV/Parquet file of coordinates, in parallel, streaming results to CSV or JSONL
+
+Usage (from backend/):
+    python batch_audit.py /data/uploads --output audit.jsonl
+    python batch_audit.py uploads.zip --output audit.csv --workers 8
+    python batch_audit.py attendance_log.csv --output coords.jsonl --checkpoint coords.ckpt
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import zipfile
+import logging
+import argparse
+import multiprocessing
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+logger = logging.getLogger("batch_audit")
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tif', '.tiff', '.heic'}
+
+OUTPUT_FIELDS = [
+    "key", "kind", "status", "latitude", "longitude", "source", "confidence",
+    "zone_id", "zone_name", "zone_chain", "error", "elapsed_ms"
+]
+
+# Per-worker services, created once by the pool initializer
+_extractor = None
+_validator = None
+_zip_handles = {}
+
+
+# ========================================
+# Inputs
+# ========================================
+
+def iter_tasks(source: Path, lat_column: str, lon_column: str, id_column: Optional[str]) -> Iterator[Tuple]:
+    """
+    Yield (key, kind, payload) tasks for a directory, zip file or coordinate file
+
+    payload is a file path for images on disk, (zip_path, member) for zip
+    members and (latitude, longitude) for coordinate rows.
+    """
+    suffix = source.suffix.lower()
+
+    if source.is_dir():
+        for path in sorted(source.rglob('*')):
+            if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS:
+                yield (str(path.relative_to(source)), "image", str(path))
+
+    elif suffix == '.zip':
+        with zipfile.ZipFile(source) as archive:
+            for member in archive.namelist():
+                if Path(member).suffix.lower() in IMAGE_EXTENSIONS:
+                    yield (member, "zip", (str(source), member))
+
+    elif suffix == '.csv':
+        with open(source, newline='', encoding='utf-8') as f:
+            for row_number, row in enumerate(csv.DictReader(f), start=1):
+                key = row[id_column] if id_column else f"row{row_number}"
+                yield (key, "coordinates", (row[lat_column], row[lon_column]))
+
+    elif suffix in ('.parquet', '.pq'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Reading Parquet files requires pyarrow (pip install pyarrow)")
+
+        columns = [lat_column, lon_column] + ([id_column] if id_column else [])
+        parquet_file = pq.ParquetFile(source)
+        row_number = 0
+        for batch in parquet_file.iter_batches(columns=columns):
+            data = batch.to_pydict()
+            for i in range(batch.num_rows):
+                row_number += 1
+                key = str(data[id_column][i]) if id_column else f"row{row_number}"
+                yield (key, "coordinates", (data[lat_column][i], data[lon_column][i]))
+
+    else:
+        raise SystemExit(f"Unsupported input: {source} (expected a directory, .zip, .csv or .parquet)")
+
+
+# ========================================
+# Workers
+# ========================================
+
+def _init_worker(log_level: int):
+    """Create one extractor (OCR engine) and validator per worker process"""
+    global _extractor, _validator
+
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # Parallelism comes from the pool; keep Tesseract single-threaded per worker
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+    # Reuse the server's learned overlay layouts, but never overwrite them
+    # (each worker would otherwise replace the templates of all the others)
+    os.environ.setdefault('LAYOUT_TEMPLATES_PERSIST', '0')
+
+    from services.gps_extractor import GPSExtractor
+    from services.location_validator import LocationValidator
+
+    _extractor = GPSExtractor()
+    _validator = LocationValidator()
+
+
+def _read_zip_member(zip_path: str, member: str) -> bytes:
+    archive = _zip_handles.get(zip_path)
+    if archive is None:
+        archive = _zip_handles[zip_path] = zipfile.ZipFile(zip_path)
+    return archive.read(member)
+
+
+def process_task(task: Tuple) -> Dict:
+    """Extract and validate one image or coordinate row"""
+    key, kind, payload = task
+    result = {field: None for field in OUTPUT_FIELDS}
+    result.update({"key": key, "kind": "coordinates" if kind == "coordinates" else "image"})
+    start = time.perf_counter()
+
+    try:
+        if kind == "coordinates":
+            latitude, longitude = float(payload[0]), float(payload[1])
+            source, confidence = "input", None
+        else:
+            if kind == "zip":
+                image_data = _read_zip_member(*payload)
+            else:
+                with open(payload, 'rb') as f:
+                    image_data = f.read()
+
+            gps_result = _extractor.extract_gps_coordinates(image_data)
+            if not gps_result:
+                result["status"] = "no_gps"
+                return result
+
+            latitude, longitude = gps_result['latitude'], gps_result['longitude']
+            source, confidence = gps_result['source'], gps_result['confidence']
+
+        validation = _validator.validate_coordinates(latitude, longitude)
+        result.update({
+            "status": validation['status'],
+            "latitude": latitude,
+            "longitude": longitude,
+            "source": source,
+            "confidence": confidence,
+            "zone_id": validation.get('zone_id'),
+            "zone_name": validation.get('zone_name'),
+            "zone_chain": " > ".join(zone['name'] for zone in validation.get('zone_chain', [])),
+        })
+
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+
+    finally:
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    return result
+
+
+# ========================================
+# Output and checkpointing
+# ========================================
+
+class ResultWriter:
+    """Appends results to CSV or JSONL, flushing as it goes"""
+
+    def __init__(self, path: Path, output_format: str):
+        self.format = output_format
+        new_file = not path.exists() or path.stat().st_size == 0
+        self._file = open(path, 'a', newline='', encoding='utf-8')
+        if output_format == 'csv':
+            self._writer = csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS)
+            if new_file:
+                self._writer.writeheader()
+
+    def write(self, result: Dict):
+        if self.format == 'csv':
+            self._writer.writerow(result)
+        else:
+            self._file.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class Checkpoint:
+    """Append-only record of finished task keys for resuming interrupted runs"""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.done: Set[str] = set()
+        self._file = None
+        if path:
+            if path.exists():
+                with open(path, encoding='utf-8') as f:
+                    self.done = {line.rstrip('\n') for line in f if line.strip()}
+            self._file = open(path, 'a', encoding='utf-8')
+
+    def mark(self, key: str):
+        if self._file:
+            self._file.write(key + '\n')
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+
+    def sync(self):
+        if self._file:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+
+class Progress:
+    """Periodic progress / throughput line on stderr"""
+
+    def __init__(self, total: Optional[int], interval: float = 2.0):
+        self.total = total
+        self.interval = interval
+        self.count = 0
+        self.counts = {}
+        self.start = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, status: str):
+        self.count += 1
+        self.counts[status] = self.counts.get(status, 0) + 1
+        now = time.perf_counter()
+        if now - self._last >= self.interval:
+            self._last = now
+            self.report()
+
+    def report(self, final: bool = False):
+        elapsed = time.perf_counter() - self.start
+        rate = self.count / elapsed if elapsed else 0.0
+        line = f"{self.count}"
+        if self.total:
+            line += f"/{self.total} ({self.count / self.total:.1%})"
+            if rate and not final:
+                line += f" ETA {(self.total - self.count) / rate:.0f}s"
+        statuses = ' '.join(f"{k}={v}" for k, v in sorted(self.counts.items()))
+        print(f"{'Done' if final else 'Progress'}: {line} | {rate:.1f} items/s | {statuses}",
+              file=sys.stderr, flush=True)
+
+
+# ========================================
+# Main
+# ========================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline batch audit of GPS images and coordinate logs")
+    parser.add_argument("input", type=Path, help="Directory of images, .zip of images, or .csv/.parquet of coordinates")
+    parser.add_argument("--output", "-o", type=Path, required=True, help="Results file (.csv or .jsonl)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Output format (default: from --output extension)")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--checkpoint", type=Path, help="Checkpoint file (default: <output>.ckpt)")
+    parser.add_argument("--lat-column", default="latitude", help="Latitude column for coordinate files")
+    parser.add_argument("--lon-column", default="longitude", help="Longitude column for coordinate files")
+    parser.add_argument("--id-column", help="Row identifier column for coordinate files (default: row number)")
+    parser.add_argument("--no-count", action="store_true", help="Skip the up-front pass that counts inputs")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Show service logs from workers")
+    args = parser.parse_args(argv)
+
+    output_format = args.format or ('csv' if args.output.suffix.lower() == '.csv' else 'jsonl')
+    checkpoint = Checkpoint(args.checkpoint or args.output.with_name(args.output.name + '.ckpt'))
+    if checkpoint.done:
+        print(f"Resuming: {len(checkpoint.done)} items already done", file=sys.stderr)
+
+    def pending():
+        for task in iter_tasks(args.input, args.lat_column, args.lon_column, args.id_column):
+            if task[0] not in checkpoint.done:
+                yield task
+
+    total = None if args.no_count else sum(1 for _ in pending())
+    progress = Progress(total)
+    writer = ResultWriter(args.output, output_format)
+    log_level = logging.INFO if args.verbose else logging.ERROR
+
+    # Workers import services relative to the backend directory
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+    try:
+        with multiprocessing.Pool(args.workers, initializer=_init_worker, initargs=(log_level,)) as pool:
+            for result in pool.imap_unordered(process_task, pending(), chunksize=4):
+                writer.write(result)
+                # Results are flushed before the checkpoint so a resumed run never
+                # loses one, and the checkpoint right after so none is redone
+                writer.flush()
+                checkpoint.mark(result["key"])
+                checkpoint.flush()
+                progress.update(result["status"])
+                if progress.count % 100 == 0:
+                    checkpoint.sync()
+    except KeyboardInterrupt:
+        print("\nInterrupted - rerun the same command to resume", file=sys.stderr)
+        return 130
+    finally:
+        checkpoint.sync()
+        checkpoint.close()
+        writer.close()
+
+    progress.report(final=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+GPS Verifier Load Test - End-to-end throughput harness for main:app
+Drives the ASGI app in-process or a locally started uvicorn with a mixed workload
+
+Each run uses a throwaway copy of the backend sources, so state the app writes
+under data/ neither leaks into the working tree nor carries over between runs.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --concurrency 1,4,16 --requests 200
+    python -m benchmarks.load_test --server --workers 1,2 --mix exif=4,ocr=1,nogps=1,coords=3,zones=1
+    python -m benchmarks.load_test --output run.json --compare baseline.json
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+from PIL import Image
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_MIX = "exif=4,ocr=1,nogps=1,coords=3,zones=1"
+
+# Campus point used for every generated request
+SAMPLE_LAT = 31.2508
+SAMPLE_LON = 75.7054
+
+
+# ========================================
+# Workload payloads
+# ========================================
+
+def _to_dms(value: float):
+    degrees = int(value)
+    minutes = int((value - degrees) * 60)
+    seconds = (value - degrees - minutes / 60) * 3600
+    return (degrees, minutes, seconds)
+
+
+def _background(width: int, height: int, seed: int) -> Image.Image:
+    """Noisy photo-like background so JPEG sizes resemble real uploads"""
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(40, 200, size=(height, width, 3), dtype=np.uint8)
+    return Image.fromarray(pixels, 'RGB')
+
+
+def make_exif_image(width: int = 1280, height: int = 960) -> bytes:
+    """JPEG carrying GPS coordinates in EXIF"""
+    image = _background(width, height, seed=1)
+    exif = Image.Exif()
+    exif[0x8825] = {1: 'N', 2: _to_dms(SAMPLE_LAT), 3: 'E', 4: _to_dms(SAMPLE_LON)}
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=85, exif=exif)
+    return buffer.getvalue()
+
+
+def make_ocr_image(width: int = 832, height: int = 1600) -> bytes:
+    """JPEG with a GPS-camera style text overlay and no EXIF"""
+    import cv2
+
+    image = np.array(_background(width, height, seed=2))[:, :, ::-1].copy()
+    band_top = int(height * 0.85)
+    image[band_top:, :] = (30, 30, 30)
+    lines = [
+        "Phagwara, Punjab, India",
+        f"Lat: {SAMPLE_LAT:.6f} Long: {SAMPLE_LON:.6f}",
+        "19/10/2026 10:42 AM GMT +05:30",
+    ]
+    for i, line in enumerate(lines):
+        y = band_top + 60 + i * 70
+        cv2.putText(image, line, (30, y), cv2.FONT_HERSHEY_SIMPLEX, 1.3, (255, 255, 255), 3, cv2.LINE_AA)
+    ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return encoded.tobytes()
+
+
+def make_plain_image(width: int = 1280, height: int = 960) -> bytes:
+    """JPEG with neither EXIF GPS nor an overlay"""
+    buffer = io.BytesIO()
+    _background(width, height, seed=3).save(buffer, 'JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def _extracted_by(source: str):
+    """Response check: coordinates were extracted by the given method"""
+    return lambda body: (body.get("extracted_gps") or {}).get("source") == source
+
+
+def build_payloads() -> Dict[str, Dict]:
+    """
+    Request templates for every workload kind
+
+    "check" validates the JSON body: extraction failures come back as 200,
+    so the status code alone can't tell a working pipeline from a broken one.
+    """
+    return {
+        "exif": {"method": "POST", "url": "/api/v1/validate-image-location",
+                 "files": ("exif.jpg", make_exif_image()), "check": _extracted_by("exif")},
+        "ocr": {"method": "POST", "url": "/api/v1/validate-image-location",
+                "files": ("overlay.jpg", make_ocr_image()), "check": _extracted_by("ocr")},
+        "nogps": {"method": "POST", "url": "/api/v1/validate-image-location",
+                  "files": ("plain.jpg", make_plain_image()), "check": lambda body: "error" in body},
+        "coords": {"method": "POST", "url": "/api/v1/validate-coordinates",
+                   "params": {"latitude": SAMPLE_LAT, "longitude": SAMPLE_LON},
+                   "check": lambda body: "status" in (body.get("validation") or {})},
+        "zones": {"method": "GET", "url": "/api/v1/zones", "check": lambda body: "zones" in body},
+    }
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """Parse 'exif=4,ocr=1' into weights"""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        weights[name] = int(weight or 1)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+def build_schedule(weights: Dict[str, int], total: int, seed: int) -> List[str]:
+    """Deterministic request sequence so runs with the same seed are comparable"""
+    rng = random.Random(seed)
+    kinds = list(weights)
+    return rng.choices(kinds, weights=[weights[k] for k in kinds], k=total)
+
+
+# ========================================
+# Memory sampling
+# ========================================
+
+def _process_tree(pid: int) -> List[int]:
+    """pid plus all descendants (Linux /proc)"""
+    pids = [pid]
+    for current in pids:
+        task_dir = Path(f"/proc/{current}/task")
+        if not task_dir.exists():
+            continue
+        for task in task_dir.iterdir():
+            try:
+                children = (task / "children").read_text().split()
+            except OSError:
+                continue
+            pids.extend(int(child) for child in children)
+    return pids
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """Current resident set size of a process and its children"""
+    total = 0
+    for current in _process_tree(pid):
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total or None
+
+
+class RSSMonitor:
+    """Tracks peak RSS of a process tree while a step runs"""
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            rss = _rss_bytes(self.pid)
+            if rss:
+                self.peak = max(self.peak, rss)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> int:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        if not self.peak and self.pid == os.getpid():
+            # No /proc (macOS): fall back to lifetime peak of this process
+            scale = 1 if sys.platform == 'darwin' else 1024
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        return self.peak
+
+
+# ========================================
+# Running steps
+# ========================================
+
+async def _send(client: httpx.AsyncClient, payload: Dict) -> bool:
+    """Send one request, returning whether it got the expected response"""
+    kwargs = {}
+    if "params" in payload:
+        kwargs["params"] = payload["params"]
+    if "files" in payload:
+        name, data = payload["files"]
+        kwargs["files"] = {"file": (name, data, "image/jpeg")}
+    response = await client.request(payload["method"], payload["url"], **kwargs)
+    if response.status_code >= 400:
+        return False
+    try:
+        return bool(payload["check"](response.json()))
+    except ValueError:
+        return False
+
+
+async def run_step(client: httpx.AsyncClient, payloads: Dict, schedule: List[str],
+                   concurrency: int, monitor_pid: int, warmup: int) -> Dict:
+    """Run one concurrency level and summarize it"""
+    # Warm caches / OCR engine outside the measured window
+    for kind in schedule[:warmup]:
+        await _send(client, payloads[kind])
+
+    queue = list(reversed(schedule))
+    latencies = {kind: [] for kind in payloads}
+    errors = {kind: 0 for kind in payloads}
+
+    async def worker():
+        while queue:
+            kind = queue.pop()
+            start = time.perf_counter()
+            try:
+                failed = not await _send(client, payloads[kind])
+            except httpx.HTTPError:
+                failed = True
+            latencies[kind].append(time.perf_counter() - start)
+            if failed:
+                errors[kind] += 1
+
+    monitor = RSSMonitor(monitor_pid)
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    peak_rss = await monitor.stop()
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    total_errors = sum(errors.values())
+
+    def percentiles(values):
+        if not values:
+            return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+        p50, p95, p99 = np.percentile(np.array(values) * 1000, [50, 95, 99])
+        return {"p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "p99_ms": round(p99, 2)}
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(all_latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(all_latencies) / elapsed, 2) if elapsed else None,
+        "error_rate": round(total_errors / len(all_latencies), 4) if all_latencies else None,
+        "peak_rss_mb": round(peak_rss / 2**20, 1) if peak_rss else None,
+        **percentiles(all_latencies),
+        "by_kind": {
+            kind: {"requests": len(values), "errors": errors[kind], **percentiles(values)}
+            for kind, values in latencies.items() if values
+        },
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def copy_backend(target: Path) -> Path:
+    """
+    Copy the backend sources (tracked and untracked, minus git-ignored files)
+
+    Git-ignored files are the app's runtime state (databases, learned data)
+    and build artefacts, so the copy starts from the same state every run.
+    """
+    try:
+        listing = subprocess.check_output(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=str(BACKEND_DIR), stderr=subprocess.DEVNULL, text=True)
+        files = [name for name in listing.split('\0') if name]
+    except (OSError, subprocess.CalledProcessError):
+        files = None
+
+    backend = target / "backend"
+    if files is None:
+        # Not a git checkout: copy everything except caches
+        shutil.copytree(BACKEND_DIR, backend, ignore=shutil.ignore_patterns('__pycache__', '*.pyc'))
+        return backend
+
+    for name in files:
+        source = BACKEND_DIR / name
+        if source.is_file():
+            destination = backend / name
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, destination)
+    return backend
+
+
+def start_server(workers: int, port: int, backend_dir: Path) -> subprocess.Popen:
+    """Start uvicorn on localhost and wait for the health check"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=str(backend_dir),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/v1/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 60s")
+
+
+async def run_in_process(args, payloads, schedule) -> List[Dict]:
+    """All steps against main:app through an ASGI transport"""
+    sys.path.insert(0, str(args.backend_dir))
+    from main import app
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport does not send lifespan events; run startup / shutdown so
+    # background work (profiling sampler, audit log flusher) is measured too
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+            for concurrency in args.concurrency:
+                step = await run_step(client, payloads, schedule, concurrency, os.getpid(), args.warmup)
+                step["workers"] = 1
+                results.append(step)
+                print_step(step)
+    return results
+
+
+async def run_against_server(args, payloads, schedule) -> List[Dict]:
+    """All steps against freshly started uvicorn processes, one per worker count"""
+    results = []
+    for workers in args.workers:
+        port = _free_port()
+        process = start_server(workers, port, args.backend_dir)
+        try:
+            limits = httpx.Limits(max_connections=max(args.concurrency))
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None, limits=limits) as client:
+                for concurrency in args.concurrency:
+                    step = await run_step(client, payloads, schedule, concurrency, process.pid, args.warmup)
+                    step["workers"] = workers
+                    results.append(step)
+                    print_step(step)
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+    return results
+
+
+# ========================================
+# Reporting
+# ========================================
+
+def print_step(step: Dict):
+    print(f"workers={step['workers']:<2} conc={step['concurrency']:<4} "
+          f"rps={step['throughput_rps']:<8} p50={step['p50_ms']}ms p95={step['p95_ms']}ms "
+          f"p99={step['p99_ms']}ms err={step['error_rate']} rss={step['peak_rss_mb']}MB", flush=True)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=str(BACKEND_DIR),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict, baseline: Dict):
+    """Print throughput / latency deltas against a previous run with the same steps"""
+    if current["config"] != baseline["config"]:
+        print("⚠️ Baseline was recorded with a different configuration; deltas may not be meaningful")
+
+    previous = {(s["workers"], s["concurrency"]): s for s in baseline["steps"]}
+    print(f"\nComparison against {baseline['meta'].get('git_commit')} ({baseline['meta']['timestamp']}):")
+    for step in current["steps"]:
+        before = previous.get((step["workers"], step["concurrency"]))
+        if not before:
+            continue
+        deltas = []
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb"):
+            if step[key] is not None and before[key]:
+                deltas.append(f"{key} {(step[key] - before[key]) / before[key] * 100:+.1f}%")
+        print(f"  workers={step['workers']} conc={step['concurrency']}: " + ", ".join(deltas))
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end load test for the GPS Verifier API")
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help=f"Workload weights, kinds: exif, ocr, nogps, coords, zones (default {DEFAULT_MIX})")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per step")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests before each step")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4, 16], help="Comma-separated levels")
+    parser.add_argument("--server", action="store_true", help="Start uvicorn locally instead of in-process ASGI")
+    parser.add_argument("--workers", type=_int_list, default=[1], help="uvicorn worker counts (with --server)")
+    parser.add_argument("--seed", type=int, default=1234, help="Seed for the request sequence")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to diff against")
+    args = parser.parse_args(argv)
+
+    weights = parse_mix(args.mix)
+    payloads = build_payloads()
+    unknown = set(weights) - set(payloads)
+    if unknown:
+        parser.error(f"unknown workload kinds: {', '.join(sorted(unknown))}")
+    payloads = {kind: payloads[kind] for kind in weights}
+    schedule = build_schedule(weights, args.requests, args.seed)
+
+    runner = run_against_server if args.server else run_in_process
+    with tempfile.TemporaryDirectory(prefix="gps-loadtest-") as tmp:
+        args.backend_dir = copy_backend(Path(tmp))
+        steps = asyncio.run(runner(args, payloads, schedule))
+
+    results = {
+        "config": {
+            "mix": weights,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "mode": "server" if args.server else "in-process",
+            "state": "fresh copy of backend/",
+        },
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "steps": steps,
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+OCR Mode Benchmark - Speed and accuracy of Tesseract OCR modes on a labelled corpus
+Compares the production default mode (stock settings through image_to_data)
+against the coordinate-focused mode, with the old image_to_string call as a
+"legacy" reference row
+
+Also reports how the text-presence triage treats the corpus: the share of
+labelled overlay images it lets through to OCR (recall) and the share of
+images without an overlay (--negatives) it skips.
+
+Corpus layout: a directory of images plus labels.csv with columns
+filename,latitude,longitude. Without --corpus a synthetic corpus of
+GPS-camera style overlays is generated (and, without --negatives, synthetic
+photos without an overlay).
+
+Usage (from backend/):
+    python -m benchmarks.ocr_benchmark
+    python -m benchmarks.ocr_benchmark --corpus /path/to/corpus --negatives /path/to/plain --repeat 3
+    python -m benchmarks.ocr_benchmark --triage-only    # no Tesseract needed
+    OCR_LANG=eng_coords python -m benchmarks.ocr_benchmark   # trimmed traineddata
+"""
+
+import csv
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Two coordinates count as equal when they agree to ~10 m
+TOLERANCE = 1e-4
+
+# Overlay text styles seen from GPS-camera apps
+SYNTHETIC_FORMATS = [
+    "Lat: {lat:.6f} Long: {lon:.6f}",
+    "Latitude {lat:.4f}° N Longitude {lon:.4f}° E",
+    "{lat:.6f}, {lon:.6f}",
+    "{lat:.6f}° N, {lon:.6f}° E",
+]
+
+
+def load_corpus(corpus_dir: Path) -> List[Tuple[str, bytes, Tuple[float, float]]]:
+    """Read images and expected coordinates from labels.csv"""
+    samples = []
+    with open(corpus_dir / 'labels.csv', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            image_path = corpus_dir / row['filename']
+            samples.append((row['filename'], image_path.read_bytes(),
+                            (float(row['latitude']), float(row['longitude']))))
+    return samples
+
+
+def synthetic_corpus(count: int, seed: int = 7) -> List[Tuple[str, bytes, Tuple[float, float]]]:
+    """Photo-like images with an address / coordinates / timestamp overlay"""
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    # (width, height, overlay text scale): phone-sized renders with the overlay
+    # scaled to the frame, and a full-resolution 12 MP frame where the camera
+    # app drew its usual small overlay
+    layouts = [(832, 1600, 832 / 700), (1080, 1920, 1080 / 700), (1600, 1200, 1600 / 700), (4000, 3000, 1.3)]
+    samples = []
+    for i in range(count):
+        width, height, scale = layouts[i % len(layouts)]
+        lat = round(float(rng.uniform(31.240, 31.262)), 6)
+        lon = round(float(rng.uniform(75.690, 75.714)), 6)
+
+        image = rng.integers(40, 200, size=(height, width, 3), dtype=np.uint8)
+        band_top = int(height * 0.82)
+        image[band_top:, :] = (image[band_top:, :] * 0.25).astype(np.uint8)
+
+        coordinate_line = SYNTHETIC_FORMATS[i % len(SYNTHETIC_FORMATS)].format(lat=lat, lon=lon)
+        # OpenCV's Hershey fonts have no degree sign
+        coordinate_line = coordinate_line.replace('°', '')
+        lines = ["Phagwara, Punjab 144411, India", coordinate_line, "19/10/2026 10:42 AM GMT +05:30"]
+        for row, line in enumerate(lines):
+            y = band_top + int((row + 1) * 55 * scale)
+            cv2.putText(image, line, (int(20 * scale), y), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.9 * scale, (255, 255, 255), max(1, int(2 * scale)), cv2.LINE_AA)
+
+        ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        samples.append((f"synthetic_{i:03d}.jpg", encoded.tobytes(), (lat, lon)))
+    return samples
+
+
+def load_negatives(negatives_dir: Path) -> List[Tuple[str, bytes]]:
+    """Read every image in a directory of photos without a coordinate overlay"""
+    extensions = {'.jpg', '.jpeg', '.png', '.webp', '.bmp'}
+    return [(path.name, path.read_bytes()) for path in sorted(negatives_dir.iterdir())
+            if path.suffix.lower() in extensions]
+
+
+def synthetic_negatives(count: int, seed: int = 11) -> List[Tuple[str, bytes]]:
+    """
+    Photo-like images without an overlay
+
+    Cycles through smooth scenes (gradients with soft shapes), textured ones
+    (speckle like leaves or gravel, plus sensor noise) and building facades
+    (rows of lit windows), the last giving the triage many wide, text-like
+    blobs the way real street photos do.
+    """
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    sizes = [(832, 1600), (1080, 1920), (1600, 1200), (4000, 3000)]
+    samples = []
+    for i in range(count):
+        width, height = sizes[i % len(sizes)]
+        y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+        image = np.dstack([
+            x / width * rng.uniform(80, 255),
+            y / height * rng.uniform(80, 255),
+            np.full((height, width), rng.uniform(0, 255), dtype=np.float32),
+        ]).astype(np.uint8)
+        for _ in range(12):
+            center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+            color = tuple(int(c) for c in rng.integers(0, 255, 3))
+            cv2.circle(image, center, int(rng.integers(20, width // 4)), color, -1)
+
+        kind = i % 3
+        if kind == 0:
+            image = cv2.GaussianBlur(image, (7, 7), 0)
+        elif kind == 1:
+            for cell in (4, 16, 48):
+                speckle = rng.integers(0, 90, size=(height // cell + 1, width // cell + 1, 1), dtype=np.uint8)
+                speckle = cv2.resize(speckle, (width, height), interpolation=cv2.INTER_NEAREST)
+                image = cv2.add(image, np.dstack([speckle] * 3))
+        else:
+            window_w = width // int(rng.integers(14, 30))
+            window_h = int(window_w * rng.uniform(0.3, 0.7))
+            for top in range(0, height, int(window_h * 2.2)):
+                for left in range(int(rng.integers(0, window_w)), width, int(window_w * 1.6)):
+                    lit = int(rng.integers(150, 255))
+                    cv2.rectangle(image, (left, top), (left + window_w, top + window_h), (lit, lit, lit), -1)
+        if kind:
+            noise = rng.normal(0, 10, size=image.shape)
+            image = np.clip(image + noise, 0, 255).astype(np.uint8)
+
+        ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        samples.append((f"plain_{i:03d}.jpg", encoded.tobytes()))
+    return samples
+
+
+def run_triage(extractor, samples, negatives) -> Dict:
+    """Run the text-presence triage over overlay images and images without one"""
+    def check(images):
+        decisions, timings = [], []
+        for data in images:
+            start = time.perf_counter()
+            decisions.append(extractor.should_attempt_ocr(data))
+            timings.append(time.perf_counter() - start)
+        return decisions, timings
+
+    passed, positive_timings = check(data for _, data, _ in samples)
+    attempted, negative_timings = check(data for _, data in negatives)
+    timings = positive_timings + negative_timings
+
+    return {
+        "overlay_images": len(passed),
+        "overlay_passed": sum(passed),
+        "recall": sum(passed) / len(passed) if passed else None,
+        "missed": [name for (name, _, _), ok in zip(samples, passed) if not ok],
+        "plain_images": len(attempted),
+        "plain_skipped": len(attempted) - sum(attempted),
+        "skip_rate": (len(attempted) - sum(attempted)) / len(attempted) if attempted else None,
+        "mean_ms": statistics.mean(timings) * 1000 if timings else 0.0,
+    }
+
+
+def print_triage(result: Dict, min_regions: int):
+    print(f"\nTriage (OCR_TRIAGE_MIN_REGIONS={min_regions}), mean {result['mean_ms']:.1f} ms/image")
+    if result['recall'] is not None:
+        print(f"  overlay images passed to OCR: {result['overlay_passed']}/{result['overlay_images']} "
+              f"({result['recall']:.1%})")
+        if result['missed']:
+            print(f"  skipped overlay images: {', '.join(result['missed'])}")
+    if result['skip_rate'] is not None:
+        print(f"  plain images skipped:         {result['plain_skipped']}/{result['plain_images']} "
+              f"({result['skip_rate']:.1%})")
+
+
+def run_mode(extractor, mode: str, samples, repeat: int) -> Dict:
+    """
+    OCR every sample with one mode, returning timings and accuracy
+    
+    'default' and 'coordinates' time the extractor's own _ocr_lines path with
+    that OCR_MODE; 'legacy' times the plain image_to_string call the extractor
+    used before word-level layout data was needed.
+    """
+    import cv2
+    import pytesseract
+
+    timings, correct, found = [], 0, 0
+    for name, data, (lat, lon) in samples:
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        processed = extractor._preprocess_for_ocr(image)
+
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            if mode == 'legacy':
+                text = pytesseract.image_to_string(processed)
+            else:
+                text, _ = extractor._ocr_lines(processed)
+            runs.append(time.perf_counter() - start)
+        timings.append(min(runs))
+
+        coordinates = extractor._parse_coordinates_from_text(text)
+        if coordinates:
+            found += 1
+            if abs(coordinates[0] - lat) <= TOLERANCE and abs(coordinates[1] - lon) <= TOLERANCE:
+                correct += 1
+
+    return {
+        "mode": mode,
+        "images": len(samples),
+        "mean_ms": statistics.mean(timings) * 1000,
+        "median_ms": statistics.median(timings) * 1000,
+        "found": found,
+        "correct": correct,
+        "accuracy": correct / len(samples) if samples else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Tesseract OCR modes for coordinate extraction")
+    parser.add_argument("--corpus", type=Path, help="Directory with images and labels.csv")
+    parser.add_argument("--synthetic", type=int, default=24, help="Synthetic images when no corpus is given")
+    parser.add_argument("--negatives", type=Path, help="Directory of images without a coordinate overlay")
+    parser.add_argument("--repeat", type=int, default=1, help="OCR runs per image (best time is kept)")
+    parser.add_argument("--triage-only", action="store_true", help="Only report the text-presence triage")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    from services.gps_extractor import GPSExtractor
+
+    extractor = GPSExtractor()
+    if not extractor.ocr_available and not args.triage_only:
+        parser.error("Tesseract is not available (use --triage-only)")
+
+    samples = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.synthetic)
+    if args.negatives:
+        negatives = load_negatives(args.negatives)
+    else:
+        negatives = [] if args.corpus else synthetic_negatives(args.synthetic)
+
+    extractor.triage_enabled = True
+    print_triage(run_triage(extractor, samples, negatives), extractor.triage_min_regions)
+    if args.triage_only:
+        return
+
+    results = []
+    for mode in ('default', 'coordinates', 'legacy'):
+        extractor.ocr_mode = 'default' if mode == 'legacy' else mode
+        results.append(run_mode(extractor, mode, samples, args.repeat))
+
+    print(f"\n{'mode':<12} {'images':>6} {'mean ms':>9} {'median ms':>10} {'found':>6} {'correct':>8} {'accuracy':>9}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['images']:>6} {r['mean_ms']:>9.1f} {r['median_ms']:>10.1f} "
+              f"{r['found']:>6} {r['correct']:>8} {r['accuracy']:>9.1%}")
+
+    # Baseline is what production runs today (OCR_MODE=default)
+    baseline, candidate = results[0], results[1]
+    if candidate['mean_ms']:
+        print(f"\nSpeedup: {baseline['mean_ms'] / candidate['mean_ms']:.2f}x, "
+              f"accuracy change: {(candidate['accuracy'] - baseline['accuracy']) * 100:+.1f} pts")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,19 +21,25 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Import our simplified API routes (after logging is configured)
-from routes.gps_api import router as gps_router
+from routes.gps_api import router as gps_router, background_sampler, audit_log
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application startup and shutdown manager"""
     # Startup
     logger.info("🚀 Starting GPS Verifier API...")
+    if background_sampler:
+        background_sampler.start()
+    await audit_log.start()
     logger.info("✅ API ready to process GPS validation requests")
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down GPS Verifier API...")
+    if background_sampler:
+        background_sampler.stop()
+    await audit_log.stop()
 
 # Create FastAPI application with clean configuration
 app = FastAPI(
@@ -4,13 +4,25 @@ GPS Validation API Routes - Simple REST endpoints for GPS validation
 Provides clean API endpoints for GPS coordinate extraction and validation
 """
 
+import os
+import hmac
+import hashlib
 import logging
-from fastapi import APIRouter, File, UploadFile, HTTPException
-from typing import Dict
+from fastapi import APIRouter, File, UploadFile, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from typing import Dict, Optional
 
 # Import our simplified services
 from services.gps_extractor import GPSExtractor
+from services.video_extractor import VideoGPSExtractor
 from services.location_validator import LocationValidator
+from services.zone_cache import ZoneResponseCache, etag_matches
+from services.admission import AdmissionController, OverloadedError
+from services.audit_log import AuditLog
+from services.profiler import (
+    RequestProfile, ProfileStore, stage, profiling_token, create_background_sampler
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -20,39 +32,133 @@ router = APIRouter(prefix="/api/v1", tags=["GPS Validation"])
 
 # Initialize services
 gps_extractor = GPSExtractor()
+video_extractor = VideoGPSExtractor(gps_extractor)
 location_validator = LocationValidator()
+zone_cache = ZoneResponseCache(location_validator)
+ocr_admission = AdmissionController()
+profile_store = ProfileStore()
+audit_log = AuditLog()
+background_sampler = create_background_sampler()
+
+# Zone data only changes on redeploy, so clients may reuse it for a while
+ZONES_CACHE_CONTROL = f"public, max-age={int(os.getenv('ZONES_CACHE_MAX_AGE', '300'))}"
+
+def _cached_json_response(request: Request, payload: bytes, etag: str) -> Response:
+    """Serve pre-serialized JSON, answering 304 when the client copy is current"""
+    headers = {
+        "ETag": etag,
+        "Cache-Control": ZONES_CACHE_CONTROL,
+        "X-Zones-Version": zone_cache.version
+    }
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+def _require_admin_token(request: Request):
+    """Reject the request unless it carries the profiling admin token"""
+    expected = profiling_token()
+    if not expected:
+        raise HTTPException(status_code=403, detail="Profiling is disabled on this server")
+    
+    supplied = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(supplied.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def _profiling_requested(request: Request, profile: bool) -> bool:
+    """Check the profile query flag / X-Profile header, enforcing the admin token"""
+    header = request.headers.get("x-profile", "").lower()
+    if not (profile or header in ("1", "true", "yes")):
+        return False
+    
+    _require_admin_token(request)
+    return True
 
 @router.post("/validate-image-location")
-async def validate_image_location(file: UploadFile = File(...)) -> Dict:
+async def validate_image_location(
+    request: Request,
+    file: UploadFile = File(...),
+    profile: bool = False
+) -> Dict:
     """
-    Extract GPS coordinates from uploaded image and validate location
+    Extract GPS coordinates from uploaded image (or short video) and validate location
     
     This endpoint:
-    1. Extracts GPS coordinates from image (EXIF, OCR, or pattern recognition)
+    1. Extracts GPS coordinates from image (EXIF, OCR, or pattern recognition),
+       or from video (container location tag, or OCR on a few sampled frames)
     2. Validates coordinates against administrative zones
     3. Returns validation result with zone information
     
     Args:
-        file: Uploaded image file (JPG, PNG, etc.)
+        file: Uploaded image file (JPG, PNG, etc.) or video clip (MP4, MOV / Live Photo)
+        profile: Profile this request (also via "X-Profile: 1"); needs X-Admin-Token
         
     Returns:
-        JSON response with GPS coordinates and validation status
+        JSON response with GPS coordinates and validation status, plus a
+        per-stage timing breakdown under "profile" when profiling
     """
+    profiling = _profiling_requested(request, profile)
+    
     try:
         # Validate file type
-        if not file.content_type or not file.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail="File must be an image")
+        content_type = file.content_type or ''
+        is_video = content_type.startswith('video/')
+        if not (content_type.startswith('image/') or is_video):
+            raise HTTPException(status_code=400, detail="File must be an image or video")
         
         # Read image data
         image_data = await file.read()
         logger.info(f"Processing image: {file.filename} ({len(image_data)} bytes)")
         
-        # Step 1: Extract GPS coordinates from image
-        gps_result = gps_extractor.extract_gps_coordinates(image_data)
+        # Stage timings are always collected (for the audit log); cProfile only
+        # when profiling, and only around the synchronous work in call()
+        request_profile = RequestProfile(deterministic=profiling)
+        with request_profile:
+            # Step 1: Extract GPS coordinates from image. EXIF / container
+            # metadata is cheap and bypasses the OCR queue; OCR runs under
+            # admission control.
+            if is_video:
+                gps_result = request_profile.call(video_extractor.extract_metadata_coordinates, image_data)
+                extract_overlay = video_extractor.extract_keyframe_coordinates
+            else:
+                gps_result = request_profile.call(gps_extractor.extract_exif_coordinates, image_data)
+                extract_overlay = gps_extractor.extract_overlay_coordinates
+            
+            if gps_result:
+                ocr_admission.record_fast_path()
+            elif is_video or await run_in_threadpool(request_profile.call, gps_extractor.should_attempt_ocr, image_data):
+                # The queue wait stays outside the profiled region
+                async with ocr_admission.slot():
+                    gps_result = await run_in_threadpool(request_profile.call, extract_overlay, image_data)
+            # Otherwise triage found no overlay text: answered without queueing behind OCR jobs
+            
+            # Step 2: Validate coordinates against zones
+            if gps_result:
+                with stage("validate"):
+                    validation_result = request_profile.call(
+                        location_validator.validate_coordinates,
+                        gps_result['latitude'], gps_result['longitude']
+                    )
+        
+        timings = {name: round(ms, 3) for name, ms in request_profile.stages.items()}
+        timings["total"] = round(request_profile.total_ms, 3)
+        content_hash = hashlib.sha256(image_data).hexdigest()
+        
+        profile_summary = None
+        if profiling:
+            profile_store.add(request_profile)
+            profile_summary = request_profile.summary()
+            profile_summary["download"] = f"/api/v1/profiles/{request_profile.profile_id}"
+            logger.info(f"⏱️ Profile {request_profile.profile_id}: {profile_summary['stages_ms']}")
         
         if not gps_result:
             logger.warning(f"No GPS coordinates found in {file.filename}")
-            return {
+            audit_log.record(
+                "validate-image-location", "no_gps",
+                filename=file.filename, content_hash=content_hash, timings=timings
+            )
+            response = {
                 "filename": file.filename,
                 "error": "No GPS coordinates found in image",
                 "suggestions": [
@@ -61,13 +167,13 @@ async def validate_image_location(file: UploadFile = File(...)) -> Dict:
                     "Verify image is not corrupted"
                 ]
             }
+            if profile_summary:
+                response["profile"] = profile_summary
+            return response
         
-        # Step 2: Validate coordinates against zones
         latitude = gps_result['latitude']
         longitude = gps_result['longitude']
         
-        validation_result = location_validator.validate_coordinates(latitude, longitude)
-        
         # Step 3: Build response
         response = {
             "filename": file.filename,
@@ -81,14 +187,31 @@ async def validate_image_location(file: UploadFile = File(...)) -> Dict:
             "validation": validation_result,
             "processing_method": gps_result['source']
         }
+        if profile_summary:
+            response["profile"] = profile_summary
         
         # Log result
         status = validation_result['status']
         zone_name = validation_result.get('zone_name', 'Unknown')
         logger.info(f"✅ Image validation: {file.filename} -> {status} ({zone_name})")
+        audit_log.record(
+            "validate-image-location", status,
+            latitude=latitude, longitude=longitude,
+            zone_id=validation_result.get('zone_id'), zone_name=zone_name,
+            source=gps_result['source'], filename=file.filename,
+            content_hash=content_hash, timings=timings
+        )
         
         return response
         
+    except OverloadedError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy processing images, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error processing {file.filename}: {e}")
         raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
@@ -114,16 +237,25 @@ async def validate_coordinates(latitude: float, longitude: float) -> Dict:
             raise HTTPException(status_code=400, detail="Longitude must be between -180 and 180")
         
         # Validate coordinates
-        validation_result = location_validator.validate_coordinates(latitude, longitude)
+        request_profile = RequestProfile(deterministic=False)
+        with request_profile, stage("validate"):
+            validation_result = location_validator.validate_coordinates(latitude, longitude)
         
         logger.info(f"✅ Coordinate validation: {latitude}, {longitude} -> {validation_result['status']}")
+        audit_log.record(
+            "validate-coordinates", validation_result['status'],
+            latitude=latitude, longitude=longitude,
+            zone_id=validation_result.get('zone_id'), zone_name=validation_result.get('zone_name'),
+            source="input", timings={"validate": round(request_profile.total_ms, 3)}
+        )
         
         return {
             "coordinates": {
                 "latitude": latitude,
                 "longitude": longitude
             },
-            "validation": validation_result
+            "validation": validation_result,
+            "zones_version": location_validator.zones_version
         }
         
     except HTTPException:
@@ -133,27 +265,48 @@ async def validate_coordinates(latitude: float, longitude: float) -> Dict:
         raise HTTPException(status_code=500, detail=f"Validation error: {str(e)}")
 
 @router.get("/zones")
-async def list_zones() -> Dict:
+async def list_zones(request: Request) -> Response:
     """
     Get list of all available administrative zones
     
+    Responses carry an ETag tied to the zone dataset version; send it back
+    in If-None-Match to get a 304 when nothing changed.
+    
     Returns:
-        JSON response with list of zones and their basic information
+        JSON response with dataset version, list of zones and their basic information
     """
     try:
-        zones = location_validator.list_available_zones()
-        
-        return {
-            "total_zones": len(zones),
-            "zones": zones
-        }
+        payload, etag = zone_cache.zone_list()
+        return _cached_json_response(request, payload, etag)
         
     except Exception as e:
         logger.error(f"❌ Error listing zones: {e}")
         raise HTTPException(status_code=500, detail=f"Error retrieving zones: {str(e)}")
 
+@router.get("/zones/index")
+async def get_zone_index(request: Request) -> Response:
+    """
+    Get the compact zone index for client-side (offline) pre-validation
+    
+    Simplified polygons quantized to 1e-6 degree and delta-encoded, with
+    bounding boxes, ordered most specific first. Versioned with the zone
+    dataset and ETag / 304 aware, so clients only re-download on change.
+    Results computed from it are preliminary; validate-coordinates is
+    authoritative.
+    
+    Returns:
+        JSON response with version, scale and encoded zones
+    """
+    try:
+        payload, etag = zone_cache.zone_index()
+        return _cached_json_response(request, payload, etag)
+        
+    except Exception as e:
+        logger.error(f"❌ Error building zone index: {e}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving zone index: {str(e)}")
+
 @router.get("/zones/{zone_id}")
-async def get_zone_info(zone_id: str) -> Dict:
+async def get_zone_info(zone_id: str, request: Request) -> Response:
     """
     Get detailed information about a specific zone
     
@@ -161,15 +314,16 @@ async def get_zone_info(zone_id: str) -> Dict:
         zone_id: Unique identifier for the zone
         
     Returns:
-        JSON response with detailed zone information
+        JSON response with detailed zone information (ETag / 304 aware)
     """
     try:
-        zone_info = location_validator.get_zone_info(zone_id)
+        cached = zone_cache.zone_detail(zone_id)
         
-        if not zone_info:
+        if not cached:
             raise HTTPException(status_code=404, detail=f"Zone '{zone_id}' not found")
         
-        return zone_info
+        payload, etag = cached
+        return _cached_json_response(request, payload, etag)
         
     except HTTPException:
         raise
@@ -177,6 +331,49 @@ async def get_zone_info(zone_id: str) -> Dict:
         logger.error(f"❌ Error getting zone info for {zone_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Error retrieving zone info: {str(e)}")
 
+@router.get("/profiles/background")
+async def get_background_profile(request: Request, reset: bool = False) -> PlainTextResponse:
+    """
+    Get continuous background samples in collapsed-stack (flamegraph) format
+    
+    Requires X-Admin-Token. Enabled by setting PROFILING_SAMPLE_HZ.
+    
+    Args:
+        reset: Discard the collected samples after returning them
+    """
+    _require_admin_token(request)
+    
+    if not background_sampler:
+        raise HTTPException(status_code=404, detail="Background sampling is not enabled")
+    
+    collapsed = background_sampler.collapsed()
+    if reset:
+        background_sampler.reset()
+    
+    return PlainTextResponse(collapsed)
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, request: Request) -> Response:
+    """
+    Download the full cProfile data of a profiled request
+    
+    Requires X-Admin-Token. Load with pstats.Stats(path) or snakeviz.
+    
+    Args:
+        profile_id: Identifier returned in the "profile" block of a profiled request
+    """
+    _require_admin_token(request)
+    
+    data = profile_store.get(profile_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"Profile '{profile_id}' not found")
+    
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'}
+    )
+
 @router.get("/health")
 async def health_check() -> Dict:
     """
@@ -191,7 +388,11 @@ async def health_check() -> Dict:
             "gps_extractor": "ready",
             "location_validator": "ready",
             "ocr_available": gps_extractor.ocr_available,
-            "zones_loaded": len(location_validator.zones)
+            "zones_loaded": len(location_validator.zones),
+            "zones_version": location_validator.zones_version,
+            "ocr_admission": ocr_admission.stats(),
+            "ocr_triage": gps_extractor.triage_stats(),
+            "audit_log": audit_log.stats()
         },
         "message": "GPS Validation API is running"
     }
\ No newline at end of file
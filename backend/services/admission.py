@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+OCR Admission Control - Concurrency cap and load shedding for OCR work
+Keeps expensive Tesseract jobs from piling up and sheds load with a Retry-After estimate
+"""
+
+import os
+import math
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class OverloadedError(Exception):
+    """Raised when the OCR queue is full and the request is shed"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"OCR queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Admission control for OCR work
+
+    At most max_concurrency jobs run at once; up to max_queue more may wait.
+    Beyond that requests are rejected with an estimate of when capacity
+    frees up, based on an exponentially weighted average service time.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, max_queue: Optional[int] = None,
+                 initial_service_time: float = 2.0):
+        """Configure limits (defaults from OCR_MAX_CONCURRENCY / OCR_QUEUE_LIMIT)"""
+        self.max_concurrency = max_concurrency or int(os.getenv('OCR_MAX_CONCURRENCY', str(os.cpu_count() or 2)))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv('OCR_QUEUE_LIMIT', '16'))
+        self.service_time = initial_service_time
+        self.active = 0
+        self.waiting = 0
+        self.admitted_count = 0
+        self.shed_count = 0
+        self.fast_path_count = 0
+        # Created on first use so it binds to the running event loop
+        self._semaphore = None
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained"""
+        backlog = self.active + self.waiting
+        return max(1, math.ceil(backlog * self.service_time / self.max_concurrency))
+
+    def record_fast_path(self):
+        """Count a request that was answered without entering the OCR queue"""
+        self.fast_path_count += 1
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold an OCR slot for the duration of the block, or raise OverloadedError"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Shed only when every slot is busy and the queue is full
+        if self.active >= self.max_concurrency and self.waiting >= self.max_queue:
+            self.shed_count += 1
+            retry_after = self.retry_after()
+            logger.warning(f"⚠️ Shedding OCR request (queue {self.waiting}, retry after {retry_after}s)")
+            raise OverloadedError(retry_after)
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        self.admitted_count += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            # EWMA keeps the estimate responsive to changing image mixes
+            self.service_time = 0.8 * self.service_time + 0.2 * elapsed
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict:
+        """Queue depth and counters for monitoring"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted_count,
+            "shed": self.shed_count,
+            "exif_fast_path": self.fast_path_count,
+            "avg_service_time_s": round(self.service_time, 3)
+        }
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Validation Audit Log - Write-behind store of validation outcomes
+Results are queued in memory and flushed in batches to SQLite (WAL mode)
+by a background task, so recording never blocks the request path
+"""
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUDIT_DB = Path(__file__).parent.parent / 'data' / 'audit.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS validation_audit (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    endpoint TEXT NOT NULL,
+    filename TEXT,
+    content_hash TEXT,
+    source TEXT,
+    latitude REAL,
+    longitude REAL,
+    status TEXT NOT NULL,
+    zone_id TEXT,
+    zone_name TEXT,
+    timings TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_validation_audit_created_at ON validation_audit (created_at);
+CREATE INDEX IF NOT EXISTS idx_validation_audit_zone_time ON validation_audit (zone_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_validation_audit_content_hash ON validation_audit (content_hash);
+"""
+
+INSERT = """
+INSERT INTO validation_audit
+    (created_at, endpoint, filename, content_hash, source, latitude, longitude,
+     status, zone_id, zone_name, timings)
+VALUES
+    (:created_at, :endpoint, :filename, :content_hash, :source, :latitude, :longitude,
+     :status, :zone_id, :zone_name, :timings)
+"""
+
+
+class AuditLog:
+    """
+    Write-behind audit log of validation results
+
+    record() only appends to an in-memory queue. A background task writes
+    queued entries in batches, whenever batch_size entries are waiting or
+    flush_interval seconds have passed, using a worker thread for SQLite.
+    When the queue is full the oldest entries are dropped and counted
+    rather than slowing requests down.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None, max_pending: Optional[int] = None):
+        """Configure the store (defaults from AUDIT_* environment variables)"""
+        self.enabled = os.getenv('AUDIT_ENABLED', '1').lower() not in ('0', 'false', 'no')
+        self.db_path = Path(db_path or os.getenv('AUDIT_DB_PATH') or DEFAULT_AUDIT_DB)
+        self.batch_size = batch_size or int(os.getenv('AUDIT_BATCH_SIZE', '100'))
+        self.flush_interval = flush_interval or float(os.getenv('AUDIT_FLUSH_INTERVAL', '1.0'))
+        max_pending = max_pending or int(os.getenv('AUDIT_MAX_PENDING', '10000'))
+
+        self._pending = deque(maxlen=max_pending)
+        self._wakeup = None
+        self._stopping = None
+        self._task = None
+        self._connection = None
+        self.written_count = 0
+        self.dropped_count = 0
+        self.failed_count = 0
+
+    def record(self, endpoint: str, status: str, latitude: Optional[float] = None,
+               longitude: Optional[float] = None, zone_id: Optional[str] = None,
+               zone_name: Optional[str] = None, source: Optional[str] = None,
+               filename: Optional[str] = None, content_hash: Optional[str] = None,
+               timings: Optional[Dict] = None):
+        """Queue a validation result (never blocks)"""
+        if not self.enabled:
+            return
+
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped_count += 1
+
+        self._pending.append({
+            "created_at": time.time(),
+            "endpoint": endpoint,
+            "filename": filename,
+            "content_hash": content_hash,
+            "source": source,
+            "latitude": latitude,
+            "longitude": longitude,
+            "status": status,
+            "zone_id": zone_id,
+            "zone_name": zone_name,
+            "timings": json.dumps(timings) if timings else None,
+        })
+
+        if self._wakeup is not None and len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def start(self):
+        """Open the database and start the background flusher"""
+        if not self.enabled or self._task is not None:
+            return
+
+        try:
+            await asyncio.to_thread(self._open)
+        except Exception as e:
+            logger.error(f"❌ Audit log disabled, cannot open {self.db_path}: {e}")
+            self.enabled = False
+            return
+
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✅ Audit log writing to {self.db_path}")
+
+    async def stop(self):
+        """Stop the flusher and write everything still queued"""
+        if self._task is None:
+            return
+
+        # Let the flusher finish its in-flight batch and exit, rather than
+        # cancelling it: cancelling the await would not stop the worker
+        # thread still writing to the connection
+        self._stopping.set()
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+        while self._pending:
+            await asyncio.to_thread(self._write_batch, self._drain())
+        await asyncio.to_thread(self._close)
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            while self._pending and not self._stopping.is_set():
+                await asyncio.to_thread(self._write_batch, self._drain())
+                if len(self._pending) < self.batch_size:
+                    break
+
+    def _drain(self) -> List[Dict]:
+        batch = []
+        while self._pending and len(batch) < self.batch_size:
+            batch.append(self._pending.popleft())
+        return batch
+
+    def _open(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Only the flusher thread pool touches the connection, one batch at a time
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._connection.commit()
+
+    def _close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _write_batch(self, batch: List[Dict]):
+        if not batch:
+            return
+        try:
+            with self._connection:
+                self._connection.executemany(INSERT, batch)
+            self.written_count += len(batch)
+        except Exception as e:
+            self.failed_count += len(batch)
+            logger.error(f"❌ Failed to write {len(batch)} audit entries: {e}")
+
+    def stats(self) -> Dict:
+        """Queue and write counters for monitoring"""
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._pending),
+            "written": self.written_count,
+            "dropped": self.dropped_count,
+            "failed": self.failed_count
+        }
@@ -5,16 +5,25 @@ Supports multiple extraction methods with Tesseract OCR integration
 """
 
 import re
+import os
 import logging
 import io
+import threading
 from PIL import Image
 from PIL.ExifTags import TAGS, GPSTAGS
 import numpy as np
 from typing import Dict, Optional, Tuple
 
+from services.profiler import stage
+from services.layout_templates import LayoutTemplateRegistry
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Characters that can appear in a coordinate overlay: digits, signs, degree
+# marks, hemisphere letters and the letters of "Latitude"/"Longitude"
+COORDINATE_CHAR_WHITELIST = "0123456789.,:-+°NSEWLatitudeLongitude"
+
 class GPSExtractor:
     """
     Unified GPS coordinate extractor that handles:
@@ -41,6 +50,26 @@ class GPSExtractor:
             r'([+-]?\d+\.?\d*)[°]?\s*[NS]\s*,?\s*([+-]?\d+\.?\d*)[°]?\s*[EW]',
         ]
         
+        # OCR mode: "default" runs the stock full-layout English recognition,
+        # "coordinates" restricts Tesseract to coordinate text (opt-in until
+        # benchmarks.ocr_benchmark numbers on real uploads justify switching)
+        self.ocr_mode = os.getenv('OCR_MODE', 'default').lower()
+        # Language / traineddata to use, e.g. a trimmed digits-only model
+        self.ocr_lang = os.getenv('OCR_LANG', 'eng')
+        self.tessdata_dir = os.getenv('TESSDATA_DIR')
+        
+        # Learned overlay layouts: crop boxes that held coordinate text before
+        self.layout_templates = LayoutTemplateRegistry()
+        
+        # Text-presence triage: skip OCR on images without overlay-like text.
+        # Opt-in until its threshold has been checked against real uploads
+        self.triage_enabled = os.getenv('OCR_TRIAGE', '0').lower() in ('1', 'true', 'yes')
+        # Minimum text-like regions in the top or bottom band to attempt OCR
+        self.triage_min_regions = int(os.getenv('OCR_TRIAGE_MIN_REGIONS', '2'))
+        self.triage_checked_count = 0
+        self.triage_skipped_count = 0
+        self._triage_lock = threading.Lock()
+        
         # Check if OCR is available
         self.ocr_available = self._setup_ocr()
         if self.ocr_available:
@@ -61,11 +90,73 @@ class GPSExtractor:
         logger.info("Starting GPS coordinate extraction")
         
         # Method 1: Try EXIF GPS data first (most accurate)
-        exif_result = self._extract_from_exif(image_data)
+        exif_result = self.extract_exif_coordinates(image_data)
         if exif_result:
-            logger.info("✅ GPS extracted from EXIF data")
             return exif_result
         
+        # Plain photos without an overlay can't yield coordinates
+        if not self.should_attempt_ocr(image_data):
+            return None
+        
+        # Methods 2 and 3: read the coordinates off the image itself
+        return self.extract_overlay_coordinates(image_data)
+    
+    def extract_exif_coordinates(self, image_data: bytes) -> Optional[Dict]:
+        """
+        Cheap path: extract GPS coordinates from EXIF metadata only
+        
+        Args:
+            image_data: Image file data as bytes
+            
+        Returns:
+            Extraction result dict, or None if the image has no EXIF GPS
+        """
+        with stage("exif"):
+            exif_result = self._extract_from_exif(image_data)
+        if exif_result:
+            logger.info("✅ GPS extracted from EXIF data")
+        return exif_result
+    
+    def should_attempt_ocr(self, image_data: bytes) -> bool:
+        """
+        Cheap triage: does the image look like it carries overlay text?
+        
+        Much cheaper than OCR (a reduced-size decode and a few morphology
+        passes), so callers can turn plain photos away before queueing them.
+        
+        Args:
+            image_data: Image file data as bytes
+            
+        Returns:
+            False if no overlay-like text was found, True otherwise (also when
+            triage is disabled or the image could not be analysed)
+        """
+        if not self.triage_enabled:
+            return True
+        
+        with stage("triage"):
+            regions = self._count_overlay_text_regions(image_data)
+        skip = regions is not None and regions < self.triage_min_regions
+        
+        with self._triage_lock:
+            self.triage_checked_count += 1
+            if skip:
+                self.triage_skipped_count += 1
+        
+        if skip:
+            logger.info(f"⏭️ No overlay text detected ({regions} text-like regions), skipping OCR")
+        return not skip
+    
+    def extract_overlay_coordinates(self, image_data: bytes) -> Optional[Dict]:
+        """
+        Expensive path: extract GPS coordinates from overlay text (OCR, then patterns)
+        
+        Args:
+            image_data: Image file data as bytes
+            
+        Returns:
+            Extraction result dict, or None if no coordinates are visible
+        """
         # Method 2: Try OCR text extraction
         if self.ocr_available:
             logger.info("🔍 Attempting OCR extraction...")
@@ -78,7 +169,8 @@ class GPSExtractor:
             logger.warning("⚠️ OCR not available - skipping OCR extraction")
         
         # Method 3: Pattern recognition fallback
-        pattern_result = self._extract_from_patterns(image_data)
+        with stage("patterns"):
+            pattern_result = self._extract_from_patterns(image_data)
         if pattern_result:
             logger.info("✅ GPS extracted using pattern recognition")
             return pattern_result
@@ -86,6 +178,71 @@ class GPSExtractor:
         logger.warning("❌ No GPS coordinates found in image")
         return None
     
+    def triage_stats(self) -> Dict:
+        """Text-presence triage counters for monitoring"""
+        with self._triage_lock:
+            return {
+                "enabled": self.triage_enabled,
+                "min_regions": self.triage_min_regions,
+                "checked": self.triage_checked_count,
+                "ocr_skipped": self.triage_skipped_count
+            }
+    
+    def _count_overlay_text_regions(self, image_data: bytes) -> Optional[int]:
+        """
+        Count text-like regions in the top and bottom bands of a thumbnail
+        
+        Decodes a 1/4-scale grayscale thumbnail (the JPEG decoder skips most of
+        the work), takes the top and bottom 25%, and finds bright-on-dark or
+        dark-on-bright strokes with a morphological gradient. Strokes are
+        merged horizontally into word blobs and counted when their size and
+        fill look like a line of text.
+        
+        Returns:
+            Highest count of text-like regions in either band, or None if the
+            image could not be analysed (OCR should then be attempted)
+        """
+        try:
+            import cv2
+            
+            nparr = np.frombuffer(image_data, np.uint8)
+            thumb = cv2.imdecode(nparr, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+            if thumb is None:
+                return None
+            
+            height, width = thumb.shape[:2]
+            if width > 320:
+                thumb = cv2.resize(thumb, (320, int(height * 320 / width)), interpolation=cv2.INTER_AREA)
+                height, width = thumb.shape[:2]
+            
+            band_height = max(1, int(height * 0.25))
+            best = 0
+            for band in (thumb[:band_height], thumb[height - band_height:]):
+                gradient = cv2.morphologyEx(band, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8))
+                _, strokes = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+                # Join characters into words / lines
+                words = cv2.morphologyEx(strokes, cv2.MORPH_CLOSE, np.ones((1, 7), np.uint8))
+                
+                count, _, stats, _ = cv2.connectedComponentsWithStats(words, connectivity=8)
+                if count <= 1:
+                    continue
+                
+                w = stats[1:, cv2.CC_STAT_WIDTH]
+                h = stats[1:, cv2.CC_STAT_HEIGHT]
+                fill = stats[1:, cv2.CC_STAT_AREA] / np.maximum(w * h, 1)
+                text_like = (
+                    (h >= 3) & (h <= band_height / 3)
+                    & (w >= 2 * h) & (w <= width * 0.95)
+                    & (fill >= 0.35)
+                )
+                best = max(best, int(np.count_nonzero(text_like)))
+            
+            return best
+            
+        except Exception as e:
+            logger.debug(f"Overlay text triage failed: {e}")
+            return None
+    
     def _setup_ocr(self) -> bool:
         """Setup and verify OCR capabilities"""
         try:
@@ -169,25 +326,79 @@ class GPSExtractor:
     def _extract_from_ocr(self, image_data: bytes) -> Optional[Dict]:
         """Extract GPS coordinates using OCR text recognition"""
         try:
-            import pytesseract
             import cv2
             
             # Convert image data to OpenCV format
-            nparr = np.frombuffer(image_data, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            with stage("decode"):
+                nparr = np.frombuffer(image_data, np.uint8)
+                image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            
+            return self.extract_from_decoded_image(image)
+            
+        except Exception as e:
+            logger.debug(f"OCR extraction failed: {e}")
+            return None
+    
+    def extract_from_decoded_image(self, image: np.ndarray) -> Optional[Dict]:
+        """
+        Run the OCR pipeline on an already decoded BGR image (e.g. a video frame)
+        
+        Args:
+            image: OpenCV BGR image array
+            
+        Returns:
+            Extraction result dict, or None if no coordinates were read
+        """
+        try:
+            height, width = image.shape[:2]
+            signature = self.layout_templates.signature(image)
+            
+            # Fast path: a known overlay layout tells us where the coordinates are
+            template = self.layout_templates.match(width, height, signature)
+            if template:
+                x0, y0, x1, y1 = template['bbox']
+                with stage("preprocess"):
+                    processed_crop = self._preprocess_for_ocr(image[y0:y1, x0:x1])
+                with stage("tesseract"):
+                    text, _ = self._ocr_lines(processed_crop, crop=True)
+                with stage("parse"):
+                    coordinates = self._parse_coordinates_from_text(text)
+                
+                if coordinates:
+                    self.layout_templates.record_hit(template)
+                    lat, lon = coordinates
+                    return {
+                        "latitude": lat,
+                        "longitude": lon,
+                        "source": "ocr",
+                        "confidence": 0.8,
+                        "note": "Extracted using Tesseract OCR (learned overlay layout)"
+                    }
+                
+                logger.debug("Layout template crop found no coordinates, running full OCR")
+                self.layout_templates.record_miss(template)
             
             # Preprocess image for better OCR
-            processed_image = self._preprocess_for_ocr(image)
+            with stage("preprocess"):
+                processed_image = self._preprocess_for_ocr(image)
             
             # Extract text using OCR
-            text = pytesseract.image_to_string(processed_image)
+            with stage("tesseract"):
+                text, lines = self._ocr_lines(processed_image)
             logger.debug(f"OCR extracted text: {repr(text)}")
             
             # Parse coordinates from extracted text
-            coordinates = self._parse_coordinates_from_text(text)
+            with stage("parse"):
+                coordinates = self._parse_coordinates_from_text(text)
             
             if coordinates:
                 lat, lon = coordinates
+                
+                # Remember where the coordinates were for the next upload of this layout
+                bbox = self._coordinate_bbox(lines, coordinates, width, height)
+                if bbox:
+                    self.layout_templates.learn(width, height, signature, bbox)
+                
                 return {
                     "latitude": lat,
                     "longitude": lon,
@@ -202,6 +413,92 @@ class GPSExtractor:
             logger.debug(f"OCR extraction failed: {e}")
             return None
     
+    def _tesseract_config(self, crop: bool = False) -> str:
+        """
+        Build the Tesseract command-line options for the current OCR mode
+        
+        Coordinate mode uses the LSTM engine only, skips full page layout
+        analysis (sparse text for whole images, a single block for layout
+        crops) and whitelists the characters coordinates are written with.
+        """
+        options = []
+        if self.tessdata_dir:
+            options.append(f'--tessdata-dir "{self.tessdata_dir}"')
+        
+        if self.ocr_mode == 'coordinates':
+            options.append('--oem 1')
+            options.append('--psm 6' if crop else '--psm 11')
+            options.append(f'-c tessedit_char_whitelist={COORDINATE_CHAR_WHITELIST}')
+        
+        return ' '.join(options)
+    
+    def _ocr_lines(self, processed_image, crop: bool = False) -> Tuple[str, list]:
+        """
+        Run Tesseract and group recognized words into lines
+        
+        Args:
+            processed_image: Preprocessed image (or layout crop)
+            crop: Image is a layout-template crop holding only the overlay lines
+            
+        Returns:
+            Full text (one line per row) and a list of (line_text, (x0, y0, x1, y1))
+        """
+        import pytesseract
+        
+        data = pytesseract.image_to_data(
+            processed_image,
+            lang=self.ocr_lang,
+            config=self._tesseract_config(crop),
+            output_type=pytesseract.Output.DICT
+        )
+        
+        lines = {}
+        for i, word in enumerate(data['text']):
+            if not word or not word.strip():
+                continue
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            left, top = data['left'][i], data['top'][i]
+            right, bottom = left + data['width'][i], top + data['height'][i]
+            
+            if key in lines:
+                words, (x0, y0, x1, y1) = lines[key]
+                words.append(word)
+                lines[key] = (words, (min(x0, left), min(y0, top), max(x1, right), max(y1, bottom)))
+            else:
+                lines[key] = ([word], (left, top, right, bottom))
+        
+        line_list = [(' '.join(words), box) for words, box in lines.values()]
+        text = '\n'.join(line_text for line_text, _ in line_list)
+        return text, line_list
+    
+    def _coordinate_bbox(self, lines: list, coordinates: Tuple[float, float],
+                         width: int, height: int) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Find the box around the OCR lines that contain the parsed coordinates
+        
+        The box spans the full image width (overlay text length varies with the
+        address) and is padded vertically by one line height.
+        """
+        targets = [round(value, 4) for value in coordinates]
+        boxes = []
+        for line_text, box in lines:
+            cleaned = re.sub(r'(\d+)\.\s+(\d+)', r'\1.\2', line_text)
+            for number in re.findall(r'[+-]?\d+\.\d+', cleaned):
+                value = float(number)
+                # Account for the 9 -> 3 latitude correction in the parser
+                candidates = [value, float('3' + number[1:])] if number.startswith('9') else [value]
+                if any(round(c, 4) in targets for c in candidates):
+                    boxes.append(box)
+                    break
+        
+        if not boxes:
+            return None
+        
+        y0 = min(box[1] for box in boxes)
+        y1 = max(box[3] for box in boxes)
+        pad = max(box[3] - box[1] for box in boxes)
+        return (0, max(0, y0 - pad), width, min(height, y1 + pad))
+    
     def _extract_from_patterns(self, image_data: bytes) -> Optional[Dict]:
         """
         Extract GPS coordinates using pattern recognition
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Overlay Layout Templates - Learned crop boxes for GPS-camera overlays
+Remembers where coordinate text appeared for a given resolution and overlay look,
+so repeat uploads from the same camera app only need a small OCR crop
+"""
+
+import os
+import json
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# fcntl is POSIX-only; without it saves still merge, just without a file lock
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATES_FILE = Path(__file__).parent.parent / 'data' / 'layout_templates.json'
+
+# Thumbnail used for the overlay signature (width, height)
+THUMB_SIZE = (32, 64)
+# Rows of the thumbnail covering the top / bottom ~15% bands
+BAND_ROWS = 10
+# Cells per band: BAND_ROWS x 32 pixels pooled into 2 x 8 cells
+CELL_ROWS = 2
+CELL_COLS = 8
+BANDS = ("top", "bottom")
+
+
+class LayoutTemplateRegistry:
+    """
+    Registry of overlay layout templates keyed by image dimensions
+
+    Each template stores the pixel box that contained the coordinate text
+    and a cheap signature of the band (top or bottom) holding that box.
+    Only that band is compared when matching, so the photo in the other
+    band does not affect reuse.
+
+    Templates are persisted to JSON so they survive restarts. Several
+    processes (uvicorn workers) may share the file: saves run on a
+    background thread and merge with what is on disk under a file lock,
+    so templates learned by other processes are kept and picked up.
+    """
+
+    def __init__(self, path: Optional[str] = None, threshold: Optional[float] = None,
+                 max_per_size: int = 8, persist: Optional[bool] = None):
+        """Load persisted templates"""
+        self.path = Path(path or os.getenv('LAYOUT_TEMPLATES_PATH') or DEFAULT_TEMPLATES_FILE)
+        # When off, templates are loaded and learned in memory but never written back
+        if persist is None:
+            persist = os.getenv('LAYOUT_TEMPLATES_PERSIST', '1').lower() not in ('0', 'false', 'no')
+        self.persist = persist
+        # Max mean luminance difference (in 1/16 steps) for a signature match
+        self.threshold = threshold if threshold is not None else float(os.getenv('LAYOUT_SIGNATURE_THRESHOLD', '1.5'))
+        self.max_per_size = max_per_size
+        self._lock = threading.Lock()
+        self._templates = {}
+        for template in self._read_file():
+            self._templates.setdefault(self._key(template['width'], template['height']), []).append(template)
+        # Ids this process dropped since the last save, so the merge doesn't restore them
+        self._dropped = set()
+        self._save_queued = False
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='layout-templates')
+
+        count = sum(len(t) for t in self._templates.values())
+        if count:
+            logger.info(f"✅ Loaded {count} overlay layout templates from {self.path}")
+
+    def signature(self, image: np.ndarray) -> Dict:
+        """
+        Compute the overlay signature of a BGR image
+
+        The image is area-downsampled to a 32x64 thumbnail; the top and bottom
+        bands are each pooled into coarse luminance cells plus the share of
+        green-dominant pixels (map-style overlays).
+        """
+        import cv2
+
+        thumb = cv2.resize(image, THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.int32)
+        rows_per_cell = BAND_ROWS // CELL_ROWS
+        cols_per_cell = THUMB_SIZE[0] // CELL_COLS
+
+        signature = {}
+        for name, band in zip(BANDS, (thumb[:BAND_ROWS], thumb[-BAND_ROWS:])):
+            blue, green, red = band[..., 0], band[..., 1], band[..., 2]
+            luma = (red * 299 + green * 587 + blue * 114) // 1000
+            cells = luma.reshape(CELL_ROWS, rows_per_cell, CELL_COLS, cols_per_cell).mean(axis=(1, 3))
+            green_dominant = (green > red + 20) & (green > blue + 20)
+            signature[name] = {
+                "luma": (cells // 16).astype(int).flatten().tolist(),
+                "green": round(float(green_dominant.mean()), 3)
+            }
+        return signature
+
+    def _band(self, bbox: Tuple[int, int, int, int], height: int) -> str:
+        """Band (top / bottom) the coordinate box lies in"""
+        return "top" if (bbox[1] + bbox[3]) / 2 < height / 2 else "bottom"
+
+    def _distance(self, a: Dict, b: Dict) -> float:
+        luma = np.abs(np.array(a["luma"]) - np.array(b["luma"])).mean()
+        return float(luma + abs(a["green"] - b["green"]) * 10)
+
+    def match(self, width: int, height: int, signature: Dict) -> Optional[Dict]:
+        """Find the closest template for these dimensions within the threshold"""
+        with self._lock:
+            candidates = self._templates.get(self._key(width, height), [])
+            best, best_distance = None, None
+            for template in candidates:
+                # Compare only the overlay band; the other band is the photo itself
+                distance = self._distance(signature[template["band"]], template["signature"])
+                if distance <= self.threshold and (best_distance is None or distance < best_distance):
+                    best, best_distance = template, distance
+
+        if best:
+            logger.debug(f"Layout template match for {width}x{height} (distance {best_distance:.2f})")
+        return best
+
+    def learn(self, width: int, height: int, signature: Dict, bbox: Tuple[int, int, int, int],
+              template: Optional[Dict] = None):
+        """
+        Record the box that yielded coordinates
+
+        Updates the given (or closest matching) template, otherwise adds a new one.
+        """
+        if template is None:
+            template = self.match(width, height, signature)
+        band = self._band(bbox, height)
+
+        with self._lock:
+            if template is not None:
+                template["bbox"] = list(bbox)
+                template["band"] = band
+                template["signature"] = signature[band]
+                template["misses"] = 0
+            else:
+                templates = self._templates.setdefault(self._key(width, height), [])
+                templates.append({
+                    "id": uuid.uuid4().hex,
+                    "width": width,
+                    "height": height,
+                    "band": band,
+                    "signature": signature[band],
+                    "bbox": list(bbox),
+                    "hits": 0,
+                    "misses": 0
+                })
+                self._trim(templates)
+                logger.info(f"📐 Learned overlay layout template for {width}x{height}: {list(bbox)}")
+            self._schedule_save()
+
+    def record_hit(self, template: Dict):
+        """Count a template crop that yielded coordinates (persisted with the next save)"""
+        with self._lock:
+            template["hits"] += 1
+            template["misses"] = 0
+
+    def record_miss(self, template: Dict):
+        """Count a failed template crop, dropping templates that keep failing"""
+        with self._lock:
+            template["misses"] += 1
+            if template["misses"] >= 3:
+                key = self._key(template["width"], template["height"])
+                self._templates[key] = [t for t in self._templates.get(key, []) if t is not template]
+                self._dropped.add(template["id"])
+                logger.info(f"🗑️ Dropped overlay layout template for {key} after repeated misses")
+                self._schedule_save()
+
+    def flush(self):
+        """Wait until pending changes have been written"""
+        self._writer.submit(lambda: None).result()
+
+    def _key(self, width: int, height: int) -> str:
+        return f"{width}x{height}"
+
+    def _trim(self, templates: List[Dict]):
+        """Keep the most useful templates for one size"""
+        templates.sort(key=lambda t: t["hits"], reverse=True)
+        del templates[self.max_per_size:]
+
+    def _read_file(self) -> List[Dict]:
+        """Read the usable templates stored on disk"""
+        try:
+            if not self.path.exists():
+                return []
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return [t for t in data.get('templates', []) if 'id' in t and 'band' in t]
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load layout templates from {self.path}: {e}")
+            return []
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared by every process saving to this path"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix('.lock'), 'w') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _schedule_save(self):
+        """Queue a save on the writer thread (caller holds the lock)"""
+        if self.persist and not self._save_queued:
+            self._save_queued = True
+            self._writer.submit(self._save)
+
+    def _save(self):
+        """Merge with the file on disk and replace it atomically"""
+        try:
+            with self._file_lock():
+                on_disk = self._read_file()
+
+                with self._lock:
+                    self._save_queued = False
+                    # Adopt templates other processes learned; ours win for shared ids
+                    known = {t["id"] for templates in self._templates.values() for t in templates}
+                    for template in on_disk:
+                        if template["id"] not in known and template["id"] not in self._dropped:
+                            key = self._key(template["width"], template["height"])
+                            self._templates.setdefault(key, []).append(template)
+                    for templates in self._templates.values():
+                        self._trim(templates)
+                    self._dropped.clear()
+                    data = json.dumps({
+                        "templates": [t for templates in self._templates.values() for t in templates]
+                    }, indent=2)
+
+                tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save layout templates to {self.path}: {e}")
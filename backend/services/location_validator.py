@@ -5,14 +5,39 @@ Validates GPS coordinates against predefined administrative zones
 """
 
 import json
+import hashlib
 import logging
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from shapely.geometry import Point, Polygon
+from shapely.prepared import prep
+from shapely.strtree import STRtree
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Sibling lists at least this long get an R-tree instead of a linear scan
+STRTREE_MIN_NODES = 8
+
+class ZoneNode:
+    """A zone in the containment hierarchy with its prepared polygon"""
+    
+    __slots__ = ('zone', 'polygon', 'prepared', 'bounds', 'area', 'children', 'child_index')
+    
+    def __init__(self, zone: Dict, polygon: Polygon):
+        self.zone = zone
+        self.polygon = polygon
+        self.prepared = prep(polygon)
+        self.bounds = polygon.bounds
+        self.area = polygon.area
+        self.children = []
+        self.child_index = None
+    
+    def may_contain(self, x: float, y: float) -> bool:
+        """Cheap bounding box check before the exact polygon test"""
+        min_x, min_y, max_x, max_y = self.bounds
+        return min_x <= x <= max_x and min_y <= y <= max_y
+
 class LocationValidator:
     """
     Simple GPS location validator that checks if coordinates 
@@ -22,7 +47,14 @@ class LocationValidator:
     def __init__(self):
         """Initialize validator with zone boundaries"""
         self.zones = self._load_zone_boundaries()
-        logger.info(f"✅ Loaded {len(self.zones)} administrative zones")
+        # id -> zone lookup so zone detail queries don't scan the list
+        self._zones_by_id = {zone.get('id'): zone for zone in self.zones}
+        # Content version of the dataset, changes whenever any zone changes
+        self.zones_version = self._compute_zones_version(self.zones)
+        # Containment hierarchy: each zone is a child of the smallest zone covering it
+        self._zone_tree = self._build_zone_tree(self.zones)
+        self._root_index = self._build_sibling_index(self._zone_tree)
+        logger.info(f"✅ Loaded {len(self.zones)} administrative zones (version {self.zones_version})")
     
     def validate_coordinates(self, latitude: float, longitude: float) -> Dict:
         """
@@ -40,39 +72,35 @@ class LocationValidator:
         # Create point from coordinates
         point = Point(longitude, latitude)  # Note: Point(x, y) = Point(lon, lat)
         
-        # Check each zone
-        for zone in self.zones:
-            try:
-                # Create polygon from zone boundary coordinates
-                if 'boundary' in zone and zone['boundary']:
-                    # Convert [lat, lon] to [lon, lat] for Shapely
-                    boundary_coords = [[coord[1], coord[0]] for coord in zone['boundary']]
-                    polygon = Polygon(boundary_coords)
-                    
-                    # Check if point is within zone
-                    if polygon.contains(point):
-                        # Calculate confidence based on distance from boundary
-                        distance = point.distance(polygon.boundary)
-                        confidence = min(1.0, max(0.5, 1.0 - distance * 100))
-                        
-                        logger.info(f"✅ Location valid: {zone['name']}")
-                        return {
-                            "status": "valid",
-                            "zone_id": zone['id'],
-                            "zone_name": zone['name'],
-                            "zone_type": zone['type'],
-                            "department": zone.get('department', 'Unknown'),
-                            "contact": zone.get('contact', ''),
-                            "email": zone.get('email', ''),
-                            "address": zone.get('address', ''),
-                            "coordinates": [latitude, longitude],
-                            "confidence": round(confidence, 2),
-                            "distance_to_boundary": round(distance, 6)
-                        }
-                        
-            except Exception as e:
-                logger.debug(f"Zone validation error for {zone.get('name', 'Unknown')}: {e}")
-                continue
+        # All containing zones, most specific first
+        chain = self.find_containing_zones(latitude, longitude)
+        
+        if chain:
+            node = chain[0]
+            zone = node.zone
+            
+            # Calculate confidence based on distance from boundary
+            distance = point.distance(node.polygon.boundary)
+            confidence = min(1.0, max(0.5, 1.0 - distance * 100))
+            
+            logger.info(f"✅ Location valid: {' → '.join(n.zone['name'] for n in chain)}")
+            return {
+                "status": "valid",
+                "zone_id": zone['id'],
+                "zone_name": zone['name'],
+                "zone_type": zone['type'],
+                "department": zone.get('department', 'Unknown'),
+                "contact": zone.get('contact', ''),
+                "email": zone.get('email', ''),
+                "address": zone.get('address', ''),
+                "zone_chain": [
+                    {"id": n.zone['id'], "name": n.zone['name'], "type": n.zone['type']}
+                    for n in chain
+                ],
+                "coordinates": [latitude, longitude],
+                "confidence": round(confidence, 2),
+                "distance_to_boundary": round(distance, 6)
+            }
         
         # No valid zone found
         logger.warning("❌ Location not within any known zone")
@@ -82,11 +110,154 @@ class LocationValidator:
             "zone_name": "Unknown Location",
             "zone_type": "unknown",
             "department": "Unknown",
+            "zone_chain": [],
             "coordinates": [latitude, longitude],
             "confidence": 0.0,
             "reason": "Location not within any administrative zone"
         }
     
+    def find_containing_zones(self, latitude: float, longitude: float) -> List[ZoneNode]:
+        """
+        Find every zone containing a point, ordered from most to least specific
+        
+        Descends the containment tree: children are only tested when their
+        parent contains the point, and long sibling lists (e.g. thousands of
+        municipal wards) are searched through an R-tree of their bounding
+        boxes, so cost scales with tree depth rather than the total number of
+        zones. Overlapping siblings (e.g. a campus and a municipal ward) are
+        all reported.
+        """
+        point = Point(longitude, latitude)
+        matches = []  # (depth, node)
+        
+        level = [(0, node) for node in self._nearby(self._zone_tree, self._root_index, point)]
+        while level:
+            next_level = []
+            for depth, node in level:
+                if node.may_contain(longitude, latitude) and node.prepared.contains(point):
+                    matches.append((depth, node))
+                    next_level.extend(
+                        (depth + 1, child) for child in self._nearby(node.children, node.child_index, point)
+                    )
+            level = next_level
+        
+        # Deepest first; among equally deep zones the smaller one is more specific
+        matches.sort(key=lambda match: (-match[0], match[1].area))
+        return [node for _, node in matches]
+    
+    def _nearby(self, nodes: List[ZoneNode], index: Optional[STRtree], point: Point) -> List[ZoneNode]:
+        """Nodes whose bounding box may contain the point"""
+        if index is None:
+            return nodes
+        return [nodes[i] for i in sorted(index.query(point))]
+    
+    def _build_sibling_index(self, nodes: List[ZoneNode]) -> Optional[STRtree]:
+        """Index long sibling lists (recursively for their children too)"""
+        for node in nodes:
+            node.child_index = self._build_sibling_index(node.children)
+        if len(nodes) < STRTREE_MIN_NODES:
+            return None
+        return STRtree([node.polygon for node in nodes])
+    
+    def _build_zone_tree(self, zones: list) -> List[ZoneNode]:
+        """Build the zone containment hierarchy, returning the root nodes"""
+        nodes = []
+        for zone in zones:
+            try:
+                if 'boundary' in zone and zone['boundary']:
+                    # Convert [lat, lon] to [lon, lat] for Shapely
+                    boundary_coords = [[coord[1], coord[0]] for coord in zone['boundary']]
+                    nodes.append(ZoneNode(zone, Polygon(boundary_coords)))
+            except Exception as e:
+                logger.debug(f"Zone polygon error for {zone.get('name', 'Unknown')}: {e}")
+        
+        # Insert largest first so every possible parent is already in the tree;
+        # an R-tree over all polygons limits the covers tests to zones whose
+        # bounding box intersects the new one instead of every inserted zone
+        nodes.sort(key=lambda n: n.area, reverse=True)
+        index = STRtree([node.polygon for node in nodes]) if nodes else None
+        roots = []
+        for position, node in enumerate(nodes):
+            parent = self._find_covering_node(nodes, index, position)
+            (parent.children if parent else roots).append(node)
+        
+        depth = self._tree_depth(roots)
+        logger.info(f"✅ Built zone hierarchy: {len(roots)} top-level zones, depth {depth}")
+        return roots
+    
+    def _find_covering_node(self, nodes: List[ZoneNode], index: STRtree, position: int) -> Optional[ZoneNode]:
+        """Smallest already-inserted node whose polygon covers nodes[position]"""
+        node = nodes[position]
+        # Nodes are sorted by decreasing area, so the latest earlier match is the smallest
+        for candidate_position in sorted(index.query(node.polygon), reverse=True):
+            if candidate_position >= position:
+                continue
+            candidate = nodes[candidate_position]
+            if candidate.prepared.covers(node.polygon):
+                return candidate
+        return None
+    
+    def compact_zone_index(self, tolerance: float = 1e-5, scale: int = 1000000) -> Dict:
+        """
+        Build a compact, simplified encoding of the zone polygons for clients
+        
+        Polygons are simplified (tolerance in degrees), quantized to 1/scale
+        degree and delta-encoded as flat [lat, lon, dlat, dlon, ...] integer
+        lists, with quantized bounding boxes for a quick reject. Zones are
+        listed most specific first (deepest in the hierarchy, then smallest),
+        so the first containing zone a client finds matches the server's
+        primary zone.
+        
+        Args:
+            tolerance: Simplification tolerance in degrees (1e-5 is about 1 m)
+            scale: Quantization steps per degree
+        """
+        entries = []
+        stack = [(node, 0, None) for node in self._zone_tree]
+        while stack:
+            node, depth, parent_id = stack.pop()
+            stack.extend((child, depth + 1, node.zone['id']) for child in node.children)
+            
+            simplified = node.polygon.simplify(tolerance, preserve_topology=True)
+            rings = [simplified.exterior] + list(simplified.interiors)
+            
+            encoded_rings = []
+            for ring in rings:
+                # Shapely stores (lon, lat); clients work in [lat, lon]
+                points = [(round(y * scale), round(x * scale)) for x, y in ring.coords[:-1]]
+                flat, prev_lat, prev_lon = [], 0, 0
+                for lat, lon in points:
+                    flat.extend((lat - prev_lat, lon - prev_lon))
+                    prev_lat, prev_lon = lat, lon
+                encoded_rings.append(flat)
+            
+            min_x, min_y, max_x, max_y = node.bounds
+            entries.append((depth, node.area, {
+                "id": node.zone['id'],
+                "name": node.zone['name'],
+                "type": node.zone['type'],
+                "parent": parent_id,
+                "bbox": [
+                    int(min_y * scale) - 1, int(min_x * scale) - 1,
+                    int(max_y * scale) + 1, int(max_x * scale) + 1
+                ],
+                "rings": encoded_rings
+            }))
+        
+        entries.sort(key=lambda entry: (-entry[0], entry[1]))
+        
+        return {
+            "version": self.zones_version,
+            "scale": scale,
+            "tolerance": tolerance,
+            "zones": [entry for _, _, entry in entries]
+        }
+    
+    def _tree_depth(self, nodes: List[ZoneNode]) -> int:
+        if not nodes:
+            return 0
+        return 1 + max(self._tree_depth(node.children) for node in nodes)
+    
     def _load_zone_boundaries(self) -> list:
         """Load administrative zone boundaries from JSON file"""
         try:
@@ -106,20 +277,24 @@ class LocationValidator:
                 # Handle the current format with nested zones
                 if 'zones' in zones_data:
                     zones = zones_data['zones']
-                elif 'educational_zones' in zones_data:
-                    # Convert the current format to expected format
-                    for zone_key, zone_data in zones_data['educational_zones'].items():
-                        zone = {
-                            'id': f"educational_zones_{zone_key}",
-                            'name': zone_data['name'],
-                            'type': zone_data['type'],
-                            'department': zone_data.get('department', 'Unknown'),
-                            'contact': zone_data.get('contact', ''),
-                            'email': zone_data.get('email', ''),
-                            'address': zone_data.get('address', ''),
-                            'boundary': zone_data.get('boundary', [])
-                        }
-                        zones.append(zone)
+                else:
+                    # Convert the current format (zones grouped by category,
+                    # e.g. educational_zones, municipal_wards) to expected format
+                    for category, category_zones in zones_data.items():
+                        if not isinstance(category_zones, dict):
+                            continue
+                        for zone_key, zone_data in category_zones.items():
+                            zone = {
+                                'id': f"{category}_{zone_key}",
+                                'name': zone_data['name'],
+                                'type': zone_data['type'],
+                                'department': zone_data.get('department', 'Unknown'),
+                                'contact': zone_data.get('contact', ''),
+                                'email': zone_data.get('email', ''),
+                                'address': zone_data.get('address', ''),
+                                'boundary': zone_data.get('boundary', [])
+                            }
+                            zones.append(zone)
             elif isinstance(zones_data, list):
                 zones = zones_data
             
@@ -153,20 +328,30 @@ class LocationValidator:
             }
         ]
     
+    def _compute_zones_version(self, zones: list) -> str:
+        """Compute a short content hash identifying the loaded zone dataset"""
+        canonical = json.dumps(zones, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+    
     def get_zone_info(self, zone_id: str) -> Optional[Dict]:
         """Get detailed information about a specific zone"""
-        for zone in self.zones:
-            if zone.get('id') == zone_id:
-                return {
-                    "id": zone['id'],
-                    "name": zone['name'],
-                    "type": zone['type'],
-                    "department": zone.get('department', 'Unknown'),
-                    "contact": zone.get('contact', ''),
-                    "email": zone.get('email', ''),
-                    "address": zone.get('address', '')
-                }
-        return None
+        zone = self._zones_by_id.get(zone_id)
+        if zone is None:
+            return None
+        
+        return {
+            "id": zone['id'],
+            "name": zone['name'],
+            "type": zone['type'],
+            "department": zone.get('department', 'Unknown'),
+            "contact": zone.get('contact', ''),
+            "email": zone.get('email', ''),
+            "address": zone.get('address', '')
+        }
+    
+    def list_zone_ids(self) -> list:
+        """Get identifiers of all available zones"""
+        return list(self._zones_by_id.keys())
     
     def list_available_zones(self) -> list:
         """Get list of all available zones"""
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Pipeline Profiler - Opt-in per-request profiling for the image pipeline
+Records per-stage timings, optional cProfile dumps and low-rate background stack samples
+"""
+
+import io
+import os
+import sys
+import time
+import uuid
+import marshal
+import pstats
+import cProfile
+import logging
+import threading
+import contextvars
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Stage timings of the request being profiled (None when profiling is off)
+_current_stages = contextvars.ContextVar('profiler_stages', default=None)
+
+# One cProfile run at a time: on Python 3.12+ profilers are process-wide
+_cprofile_lock = threading.Lock()
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a pipeline stage for the active profile
+
+    Costs a single context variable lookup when no profile is active.
+    Repeated stages with the same name are accumulated.
+    """
+    stages = _current_stages.get()
+    if stages is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        stages[name] = stages.get(name, 0.0) + elapsed_ms
+
+
+class RequestProfile:
+    """
+    Profile of a single request: stage timings plus an optional cProfile run
+
+    Entering the profile only starts stage timing. cProfile is enabled
+    around the synchronous work passed to call(), on whichever thread runs
+    it, so awaits (queue waits, other requests' coroutines on the event
+    loop) never end up in the dump.
+    """
+
+    def __init__(self, deterministic: bool = True):
+        """Create a profile, optionally backed by cProfile"""
+        self.profile_id = uuid.uuid4().hex
+        self.stages = {}
+        self.total_ms = 0.0
+        self.skipped_calls = 0
+        self._profiler = cProfile.Profile() if deterministic else None
+        self._token = None
+        self._start = 0.0
+
+    def __enter__(self):
+        self._token = _current_stages.set(self.stages)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+        _current_stages.reset(self._token)
+        return False
+
+    def call(self, func, *args, **kwargs):
+        """
+        Run func, under cProfile when this profile is deterministic
+
+        If another request is being profiled at the same moment, func runs
+        unprofiled (stage timings are still recorded) and is counted in
+        skipped_calls.
+        """
+        if not self._profiler:
+            return func(*args, **kwargs)
+
+        if not _cprofile_lock.acquire(blocking=False):
+            self.skipped_calls += 1
+            return func(*args, **kwargs)
+
+        try:
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # Another profiling tool (e.g. a debugger) is active
+                self.skipped_calls += 1
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._profiler.disable()
+        finally:
+            _cprofile_lock.release()
+
+    def summary(self, top: int = 15) -> Dict:
+        """Get the stage breakdown and the hottest functions"""
+        result = {
+            "profile_id": self.profile_id,
+            "total_ms": round(self.total_ms, 3),
+            "stages_ms": {name: round(ms, 3) for name, ms in self.stages.items()},
+        }
+
+        if self.skipped_calls:
+            result["note"] = (f"{self.skipped_calls} step(s) ran without cProfile because "
+                              "another request was being profiled")
+
+        if self._profiler and self._profiler.getstats():
+            stream = io.StringIO()
+            stats = pstats.Stats(self._profiler, stream=stream)
+            stats.sort_stats('cumulative').print_stats(top)
+            result["top_functions"] = stream.getvalue()
+
+        return result
+
+    def dump(self) -> Optional[bytes]:
+        """Get the full cProfile data in pstats format"""
+        if not self._profiler:
+            return None
+
+        # Same marshal format as Profile.dump_stats, readable by pstats / snakeviz
+        self._profiler.create_stats()
+        return marshal.dumps(self._profiler.stats)
+
+
+class ProfileStore:
+    """Bounded in-memory store of recent full profiles for download"""
+
+    def __init__(self, max_profiles: int = 20):
+        """Keep up to max_profiles most recent dumps"""
+        self.max_profiles = max_profiles
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        """Store a profile's dump if it has one"""
+        data = profile.dump()
+        if data is None:
+            return
+
+        with self._lock:
+            self._profiles[profile.profile_id] = data
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[bytes]:
+        """Get a stored profile dump"""
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+
+class BackgroundSampler:
+    """
+    Low-rate statistical profiler for continuous production use
+
+    A daemon thread samples the stacks of all other threads at a fixed
+    rate and aggregates them as collapsed stacks (flamegraph input).
+    """
+
+    def __init__(self, interval: float = 0.1, max_depth: int = 64):
+        """Sample every interval seconds"""
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self.sample_count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start sampling in a daemon thread"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="background-sampler", daemon=True)
+        self._thread.start()
+        logger.info(f"✅ Background sampler started ({1 / self.interval:.1f} Hz)")
+
+    def stop(self):
+        """Stop sampling"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, frame in frames.items():
+                    if thread_id == own_id:
+                        continue
+                    self.samples[self._collapse(frame)] += 1
+                self.sample_count += 1
+
+    def _collapse(self, frame) -> str:
+        """Render a stack as 'outer;...;inner' function names"""
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def collapsed(self) -> str:
+        """Get aggregated samples in collapsed-stack format"""
+        with self._lock:
+            lines = [f"{stack} {count}" for stack, count in self.samples.most_common()]
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def reset(self):
+        """Discard collected samples"""
+        with self._lock:
+            self.samples.clear()
+            self.sample_count = 0
+
+
+def profiling_token() -> Optional[str]:
+    """Admin token that unlocks profiling, None when profiling is disabled"""
+    return os.getenv('PROFILING_ADMIN_TOKEN') or None
+
+
+def create_background_sampler() -> Optional[BackgroundSampler]:
+    """Build a background sampler from PROFILING_SAMPLE_HZ, if configured"""
+    try:
+        hz = float(os.getenv('PROFILING_SAMPLE_HZ', '0'))
+    except ValueError:
+        logger.warning("⚠️ Invalid PROFILING_SAMPLE_HZ, background sampling disabled")
+        return None
+
+    if hz <= 0:
+        return None
+    return BackgroundSampler(interval=1.0 / hz)
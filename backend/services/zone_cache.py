@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Zone Response Cache - Pre-serialized zone listings with ETags
+Serializes zone responses once per dataset version so the zone endpoints
+only have to copy bytes out of memory
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from typing import Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# orjson is optional - fall back to the standard library encoder
+try:
+    import orjson
+
+    def dumps(obj) -> bytes:
+        """Serialize an object to JSON bytes"""
+        return orjson.dumps(obj)
+
+    JSON_ENCODER = "orjson"
+except ImportError:
+    def dumps(obj) -> bytes:
+        """Serialize an object to JSON bytes"""
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    JSON_ENCODER = "json"
+
+
+def make_etag(payload: bytes) -> str:
+    """Build a strong ETag from serialized response bytes"""
+    return '"' + hashlib.blake2b(payload, digest_size=8).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        # Weak comparison is what conditional GET uses
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ZoneResponseCache:
+    """
+    Holds serialized zone list and per-zone responses for the
+    current dataset version of a LocationValidator
+    """
+
+    def __init__(self, validator):
+        """Bind the cache to a location validator"""
+        self.validator = validator
+        self._lock = threading.Lock()
+        self._version = None
+        self._zone_list = None
+        self._zone_details = {}
+        self._zone_index = None
+
+    def _ensure_current(self):
+        """Rebuild serialized payloads if the dataset version changed"""
+        version = self.validator.zones_version
+        if version == self._version:
+            return
+
+        with self._lock:
+            if version == self._version:
+                return
+
+            zones = self.validator.list_available_zones()
+            zone_list = dumps({
+                "version": version,
+                "total_zones": len(zones),
+                "zones": zones
+            })
+
+            zone_details = {}
+            for zone_id in self.validator.list_zone_ids():
+                payload = dumps(self.validator.get_zone_info(zone_id))
+                zone_details[zone_id] = (payload, make_etag(payload))
+
+            zone_index = dumps(self.validator.compact_zone_index())
+
+            self._zone_list = (zone_list, make_etag(zone_list))
+            self._zone_details = zone_details
+            self._zone_index = (zone_index, make_etag(zone_index))
+            self._version = version
+            logger.info(f"✅ Serialized {len(zone_details)} zone responses (version {version}, {JSON_ENCODER})")
+
+    @property
+    def version(self) -> str:
+        """Dataset version the cached payloads belong to"""
+        self._ensure_current()
+        return self._version
+
+    def zone_list(self) -> Tuple[bytes, str]:
+        """Get the serialized zone list and its ETag"""
+        self._ensure_current()
+        return self._zone_list
+
+    def zone_index(self) -> Tuple[bytes, str]:
+        """Get the serialized compact client-side zone index and its ETag"""
+        self._ensure_current()
+        return self._zone_index
+
+    def zone_detail(self, zone_id: str) -> Optional[Tuple[bytes, str]]:
+        """Get the serialized zone detail and its ETag, or None if unknown"""
+        self._ensure_current()
+        return self._zone_details.get(zone_id)
+
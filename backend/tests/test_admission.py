@@ -0,0 +1,117 @@
+"""OCR admission control: concurrency cap, queue limit and load shedding"""
+
+import asyncio
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from main import app
+from routes import gps_api
+from services.admission import AdmissionController, OverloadedError
+
+
+async def hold(controller, release):
+    async with controller.slot():
+        await release.wait()
+
+
+async def settle():
+    # Let the started tasks run until they hold a slot or wait for one
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_sheds_when_slots_and_queue_are_full():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=2, max_queue=1, initial_service_time=3.0)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(hold(controller, release)) for _ in range(3)]
+        await settle()
+
+        stats = controller.stats()
+        assert stats["active"] == 2
+        assert stats["queue_depth"] == 1
+
+        with pytest.raises(OverloadedError) as excinfo:
+            async with controller.slot():
+                pass
+        # Three jobs in flight at 3 s each over two slots
+        assert excinfo.value.retry_after == 5
+        assert controller.stats()["shed"] == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["active"] == 0
+    assert stats["queue_depth"] == 0
+    assert stats["admitted"] == 3
+    assert stats["shed"] == 1
+
+
+def test_retry_after_is_at_least_one_second():
+    controller = AdmissionController(max_concurrency=4, max_queue=0, initial_service_time=0.01)
+    assert controller.retry_after() == 1
+
+
+def test_slot_is_released_when_the_block_raises():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=0)
+        with pytest.raises(RuntimeError):
+            async with controller.slot():
+                raise RuntimeError("tesseract failed")
+
+        # The only slot is free again, so this neither waits nor sheds
+        async with controller.slot():
+            assert controller.stats()["active"] == 1
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["active"] == 0
+    assert stats["admitted"] == 2
+    assert stats["shed"] == 0
+
+
+def test_service_time_tracks_completed_jobs():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=0, initial_service_time=2.0)
+        async with controller.slot():
+            pass
+        return controller.service_time
+
+    # One near-instant job pulls the 2 s estimate down by a fifth
+    assert asyncio.run(scenario()) == pytest.approx(1.6, abs=0.01)
+
+
+def test_exif_fast_path_is_counted_without_a_slot():
+    controller = AdmissionController(max_concurrency=1, max_queue=0)
+    controller.record_fast_path()
+    controller.record_fast_path()
+
+    stats = controller.stats()
+    assert stats["exif_fast_path"] == 2
+    assert stats["admitted"] == 0
+    assert stats["active"] == 0
+
+
+def test_exif_upload_takes_the_fast_path(monkeypatch):
+    controller = AdmissionController(max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(gps_api, "ocr_admission", controller)
+
+    exif = Image.Exif()
+    exif[0x8825] = {1: "N", 2: (31, 15, 2.88), 3: "E", 4: (75, 42, 19.44)}
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (90, 120, 60)).save(buffer, "JPEG", exif=exif)
+
+    client = TestClient(app)
+    response = client.post("/api/v1/validate-image-location",
+                           files={"file": ("exif.jpg", buffer.getvalue(), "image/jpeg")})
+    assert response.status_code == 200
+    assert response.json()["extracted_gps"]["source"] == "exif"
+
+    stats = client.get("/api/v1/health").json()["components"]["ocr_admission"]
+    assert stats["exif_fast_path"] == 1
+    assert stats["admitted"] == 0
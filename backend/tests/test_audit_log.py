@@ -0,0 +1,93 @@
+"""Write-behind SQLite audit log: batching, shutdown drain and overflow"""
+
+import asyncio
+import sqlite3
+
+from services.audit_log import AuditLog
+
+
+def _rows(db_path):
+    with sqlite3.connect(str(db_path)) as connection:
+        return connection.execute(
+            "SELECT filename, status, zone_id FROM validation_audit ORDER BY id"
+        ).fetchall()
+
+
+def _record(audit_log, count, start=0):
+    for i in range(start, start + count):
+        audit_log.record("validate-image-location", "valid", latitude=31.25, longitude=75.70,
+                         zone_id="ward_1", filename=f"img_{i}.jpg", timings={"total": 1.0})
+
+
+def test_background_flush_writes_batches(tmp_path):
+    db_path = tmp_path / "audit.db"
+
+    async def scenario():
+        audit_log = AuditLog(db_path=str(db_path), batch_size=10, flush_interval=0.05)
+        await audit_log.start()
+        _record(audit_log, 25)
+        # Written by the background task, before shutdown
+        for _ in range(100):
+            if audit_log.written_count == 25:
+                break
+            await asyncio.sleep(0.02)
+        written_while_running = audit_log.written_count
+        await audit_log.stop()
+        return written_while_running, audit_log.stats()
+
+    written_while_running, stats = asyncio.run(scenario())
+    assert written_while_running == 25
+    assert stats == {"enabled": True, "pending": 0, "written": 25, "dropped": 0, "failed": 0}
+
+    rows = _rows(db_path)
+    assert len(rows) == 25
+    assert rows[0] == ("img_0.jpg", "valid", "ward_1")
+
+
+def test_stop_drains_the_queue(tmp_path):
+    db_path = tmp_path / "audit.db"
+
+    async def scenario():
+        # Long interval: nothing is flushed before stop() unless stop drains it
+        audit_log = AuditLog(db_path=str(db_path), batch_size=4, flush_interval=60)
+        await audit_log.start()
+        _record(audit_log, 3)
+        await audit_log.stop()
+        return audit_log.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["written"] == 3
+    assert stats["pending"] == 0
+    assert len(_rows(db_path)) == 3
+
+
+def test_full_queue_drops_oldest_entries(tmp_path):
+    db_path = tmp_path / "audit.db"
+    audit_log = AuditLog(db_path=str(db_path), batch_size=3, flush_interval=60, max_pending=5)
+
+    # Queued before the flusher starts, so only the newest 5 survive
+    _record(audit_log, 12)
+    assert audit_log.stats()["dropped"] == 7
+
+    async def scenario():
+        await audit_log.start()
+        await audit_log.stop()
+
+    asyncio.run(scenario())
+    assert audit_log.stats()["written"] == 5
+    assert [row[0] for row in _rows(db_path)] == [f"img_{i}.jpg" for i in range(7, 12)]
+
+
+def test_disabled_log_records_nothing(tmp_path, monkeypatch):
+    monkeypatch.setenv("AUDIT_ENABLED", "0")
+    db_path = tmp_path / "audit.db"
+    audit_log = AuditLog(db_path=str(db_path))
+
+    async def scenario():
+        await audit_log.start()
+        _record(audit_log, 3)
+        await audit_log.stop()
+
+    asyncio.run(scenario())
+    assert audit_log.stats()["pending"] == 0
+    assert not db_path.exists()
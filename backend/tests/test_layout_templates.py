@@ -0,0 +1,109 @@
+"""Overlay layout template signatures, matching and persistence"""
+
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from services.layout_templates import LayoutTemplateRegistry
+
+WIDTH, HEIGHT = 832, 1600
+BBOX = (0, 1300, WIDTH, 1500)
+
+
+def photo(seed, overlay=(30, 30, 30)):
+    """A random smooth scene with a dark GPS-camera band at the bottom"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:HEIGHT, 0:WIDTH]
+    image = np.dstack([
+        (x / WIDTH * 255 * rng.random()) % 255,
+        y / HEIGHT * 255 * rng.random(),
+        np.full((HEIGHT, WIDTH), rng.integers(0, 255)),
+    ]).astype(np.uint8)
+    image[int(HEIGHT * 0.85):] = overlay
+    cv2.putText(image, "Lat: 31.250800 Long: 75.705400", (30, int(HEIGHT * 0.85) + 100),
+                cv2.FONT_HERSHEY_SIMPLEX, 1.3, (255, 255, 255), 3)
+    return image
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return LayoutTemplateRegistry(path=str(tmp_path / "templates.json"))
+
+
+def test_signature_has_both_bands(registry):
+    signature = registry.signature(photo(1))
+    for band in ("top", "bottom"):
+        assert len(signature[band]["luma"]) == 16
+        assert 0.0 <= signature[band]["green"] <= 1.0
+
+
+def test_match_ignores_the_scene_outside_the_overlay_band(registry):
+    registry.learn(WIDTH, HEIGHT, registry.signature(photo(1)), BBOX)
+
+    for seed in range(2, 10):
+        template = registry.match(WIDTH, HEIGHT, registry.signature(photo(seed)))
+        assert template is not None
+        assert template["bbox"] == list(BBOX)
+        assert template["band"] == "bottom"
+
+
+def test_no_match_for_another_overlay_or_size(registry):
+    registry.learn(WIDTH, HEIGHT, registry.signature(photo(1)), BBOX)
+
+    assert registry.match(WIDTH, HEIGHT, registry.signature(photo(2, overlay=(240, 240, 240)))) is None
+    assert registry.match(HEIGHT, WIDTH, registry.signature(photo(2))) is None
+
+
+def test_learn_updates_the_matching_template(registry):
+    registry.learn(WIDTH, HEIGHT, registry.signature(photo(1)), BBOX)
+    registry.learn(WIDTH, HEIGHT, registry.signature(photo(2)), (0, 1320, WIDTH, 1520))
+
+    template = registry.match(WIDTH, HEIGHT, registry.signature(photo(3)))
+    assert template["bbox"] == [0, 1320, WIDTH, 1520]
+    assert len(registry._templates[f"{WIDTH}x{HEIGHT}"]) == 1
+
+
+def test_template_dropped_after_three_misses(registry):
+    registry.learn(WIDTH, HEIGHT, registry.signature(photo(1)), BBOX)
+    template = registry.match(WIDTH, HEIGHT, registry.signature(photo(1)))
+
+    registry.record_miss(template)
+    registry.record_hit(template)  # a hit resets the miss count
+    registry.record_miss(template)
+    registry.record_miss(template)
+    assert registry.match(WIDTH, HEIGHT, registry.signature(photo(1))) is not None
+
+    registry.record_miss(template)
+    assert registry.match(WIDTH, HEIGHT, registry.signature(photo(1))) is None
+
+    registry.flush()
+    assert json.loads(registry.path.read_text())["templates"] == []
+
+
+def test_processes_sharing_a_file_keep_each_others_templates(tmp_path):
+    path = str(tmp_path / "templates.json")
+    first = LayoutTemplateRegistry(path=path)
+    second = LayoutTemplateRegistry(path=path)
+
+    first.learn(WIDTH, HEIGHT, first.signature(photo(1)), BBOX)
+    first.flush()
+    second.learn(HEIGHT, WIDTH, second.signature(photo(2)), (0, 600, HEIGHT, 800))
+    second.flush()
+
+    # The second save merged instead of replacing the first worker's template
+    fresh = LayoutTemplateRegistry(path=path)
+    assert fresh.match(WIDTH, HEIGHT, fresh.signature(photo(3))) is not None
+    assert len(json.loads(fresh.path.read_text())["templates"]) == 2
+    # ... and the second worker picked it up as well
+    assert second.match(WIDTH, HEIGHT, second.signature(photo(3))) is not None
+
+
+def test_persist_off_never_writes(tmp_path):
+    registry = LayoutTemplateRegistry(path=str(tmp_path / "templates.json"), persist=False)
+    registry.learn(WIDTH, HEIGHT, registry.signature(photo(1)), BBOX)
+    registry.flush()
+
+    assert registry.match(WIDTH, HEIGHT, registry.signature(photo(2))) is not None
+    assert not registry.path.exists()
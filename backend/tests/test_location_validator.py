@@ -0,0 +1,109 @@
+"""Zone loading and containment-hierarchy lookups"""
+
+import time
+
+import pytest
+from shapely.geometry import Point, Polygon
+
+from services.location_validator import LocationValidator
+
+
+@pytest.fixture(scope="module")
+def validator():
+    return LocationValidator()
+
+
+def _chain_ids(validator, latitude, longitude):
+    return [node.zone['id'] for node in validator.find_containing_zones(latitude, longitude)]
+
+
+def test_loads_every_zone_category(validator):
+    assert sorted(validator.list_zone_ids()) == [
+        "educational_zones_LPU_Main",
+        "government_zones_District_Collectorate",
+        "health_zones_Civil_Hospital",
+        "municipal_wards_Jalandhar_Central",
+        "municipal_wards_Jalandhar_North",
+    ]
+
+
+@pytest.mark.parametrize("latitude, longitude, zone_id", [
+    (31.2494, 75.7025, "educational_zones_LPU_Main"),
+    (31.2700, 75.6900, "municipal_wards_Jalandhar_North"),
+    (31.3300, 75.5900, "government_zones_District_Collectorate"),
+    (31.3100, 75.5500, "health_zones_Civil_Hospital"),
+])
+def test_non_campus_categories_validate(validator, latitude, longitude, zone_id):
+    result = validator.validate_coordinates(latitude, longitude)
+    assert result["status"] == "valid"
+    assert result["zone_id"] == zone_id
+
+
+def test_campus_ward_overlap_lists_campus_first(validator):
+    # South-west corner of the campus lies inside the Jalandhar Central ward
+    assert _chain_ids(validator, 31.2461, 75.6962) == [
+        "educational_zones_LPU_Main",
+        "municipal_wards_Jalandhar_Central",
+    ]
+
+    result = validator.validate_coordinates(31.2461, 75.6962)
+    assert result["zone_id"] == "educational_zones_LPU_Main"
+    assert [zone["id"] for zone in result["zone_chain"]] == [
+        "educational_zones_LPU_Main",
+        "municipal_wards_Jalandhar_Central",
+    ]
+
+
+def test_point_outside_every_zone_is_invalid(validator):
+    result = validator.validate_coordinates(31.0, 75.0)
+    assert result["status"] == "invalid"
+    assert result["zone_chain"] == []
+
+
+def _square(zone_id, lat, lon, size):
+    return {
+        "id": zone_id, "name": zone_id, "type": "ward",
+        "boundary": [[lat, lon], [lat, lon + size], [lat + size, lon + size], [lat + size, lon]],
+    }
+
+
+def test_many_sibling_zones_match_a_linear_scan(monkeypatch):
+    # 30 x 30 grid of non-nested wards; a district covers the 5 x 5 corner
+    zones = [
+        _square(f"ward_{row}_{col}", 30 + row * 0.01, 75 + col * 0.01, 0.01)
+        for row in range(30) for col in range(30)
+    ]
+    zones.append(_square("district", 30.0, 75.0, 0.05))
+    monkeypatch.setattr(LocationValidator, "_load_zone_boundaries", lambda self: zones)
+
+    validator = LocationValidator()
+    assert validator._root_index is not None
+
+    polygons = {zone["id"]: Polygon([(lon, lat) for lat, lon in zone["boundary"]]) for zone in zones}
+    for latitude, longitude in [(30.005, 75.005), (30.043, 75.021), (30.155, 75.287), (29.9, 75.1)]:
+        point = Point(longitude, latitude)
+        expected = {zone_id for zone_id, polygon in polygons.items() if polygon.contains(point)}
+        assert set(_chain_ids(validator, latitude, longitude)) == expected
+
+    assert _chain_ids(validator, 30.043, 75.021) == ["ward_4_2", "district"]
+
+
+def test_hierarchy_build_scales_with_thousands_of_wards(monkeypatch):
+    # 50 x 50 grid of wards, each with a building in it: the tree build used
+    # to test every inserted root for each new zone (tens of seconds here)
+    zones = []
+    for row in range(50):
+        for col in range(50):
+            lat, lon = 30 + row * 0.01, 75 + col * 0.01
+            zones.append(_square(f"ward_{row}_{col}", lat, lon, 0.01))
+            zones.append(_square(f"building_{row}_{col}", lat + 0.004, lon + 0.004, 0.002))
+    monkeypatch.setattr(LocationValidator, "_load_zone_boundaries", lambda self: zones)
+
+    start = time.perf_counter()
+    validator = LocationValidator()
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 5.0
+    assert len(validator._zone_tree) == 2500
+    assert all(len(node.children) == 1 for node in validator._zone_tree)
+    assert _chain_ids(validator, 30.255, 75.375) == ["building_25_37", "ward_25_37"]
@@ -0,0 +1,63 @@
+"""Text-presence triage in front of OCR"""
+
+import cv2
+import numpy as np
+import pytest
+
+from services.gps_extractor import GPSExtractor
+
+WIDTH, HEIGHT = 1080, 1920
+
+
+def _jpeg(image):
+    ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return encoded.tobytes()
+
+
+def overlay_photo():
+    """Noisy scene with a dark GPS-camera band and three lines of text"""
+    rng = np.random.default_rng(1)
+    image = rng.integers(40, 200, size=(HEIGHT, WIDTH, 3), dtype=np.uint8)
+    top = int(HEIGHT * 0.82)
+    image[top:] = (image[top:] * 0.25).astype(np.uint8)
+    lines = ["Phagwara, Punjab 144411, India", "Lat 31.250800 Long 75.705400", "19/10/2026 10:42 AM"]
+    for row, line in enumerate(lines):
+        cv2.putText(image, line, (30, top + (row + 1) * 85), cv2.FONT_HERSHEY_SIMPLEX,
+                    1.4, (255, 255, 255), 3, cv2.LINE_AA)
+    return _jpeg(image)
+
+
+def plain_photo():
+    """Smooth gradient scene without any text"""
+    y, x = np.mgrid[0:HEIGHT, 0:WIDTH].astype(np.float32)
+    image = np.dstack([x / WIDTH * 200, y / HEIGHT * 180, np.full((HEIGHT, WIDTH), 90, np.float32)])
+    return _jpeg(cv2.GaussianBlur(image.astype(np.uint8), (7, 7), 0))
+
+
+@pytest.fixture
+def extractor(monkeypatch, tmp_path):
+    monkeypatch.setenv("LAYOUT_TEMPLATES_PATH", str(tmp_path / "templates.json"))
+    monkeypatch.delenv("OCR_TRIAGE", raising=False)
+    return GPSExtractor()
+
+
+def test_triage_is_off_by_default(extractor):
+    assert extractor.should_attempt_ocr(plain_photo())
+    assert extractor.triage_stats() == {"enabled": False, "min_regions": 2, "checked": 0, "ocr_skipped": 0}
+
+
+def test_triage_skips_plain_photos_and_keeps_overlays(extractor):
+    extractor.triage_enabled = True
+
+    assert extractor.should_attempt_ocr(overlay_photo())
+    assert not extractor.should_attempt_ocr(plain_photo())
+
+    stats = extractor.triage_stats()
+    assert stats["checked"] == 2
+    assert stats["ocr_skipped"] == 1
+
+
+def test_undecodable_upload_still_goes_to_ocr(extractor):
+    extractor.triage_enabled = True
+    assert extractor.should_attempt_ocr(b"not an image")
+    assert extractor.triage_stats()["ocr_skipped"] == 0
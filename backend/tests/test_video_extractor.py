@@ -0,0 +1,112 @@
+"""MP4 / QuickTime box walking and ISO 6709 location parsing"""
+
+import struct
+import time
+
+import pytest
+
+from services.video_extractor import VideoGPSExtractor, _iter_boxes, _parse_iso6709, APPLE_LOCATION_KEY
+
+
+def box(box_type: bytes, payload: bytes = b'') -> bytes:
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def xyz_box(text: str) -> bytes:
+    encoded = text.encode()
+    return box(b'\xa9xyz', struct.pack('>HH', len(encoded), 0x15c7) + encoded)
+
+
+def apple_meta(location: str, key: bytes = APPLE_LOCATION_KEY) -> bytes:
+    keys = box(b'keys', struct.pack('>II', 0, 1) + struct.pack('>I4s', 8 + len(key), b'mdta') + key)
+    data = box(b'data', struct.pack('>II', 1, 0) + location.encode())
+    ilst = box(b'ilst', box(struct.pack('>I', 1), data))
+    hdlr = box(b'hdlr', b'\x00' * 24)
+    return box(b'meta', hdlr + keys + ilst)
+
+
+def mp4(*moov_children: bytes) -> bytes:
+    return box(b'ftyp', b'qt  \x00\x00\x00\x00') + box(b'moov', b''.join(moov_children)) + box(b'mdat', b'\x00' * 64)
+
+
+@pytest.fixture
+def extractor():
+    return VideoGPSExtractor(gps_extractor=None)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("+31.2508+075.7054+245.000/", (31.2508, 75.7054)),
+    ("-33.8688+151.2093/", (-33.8688, 151.2093)),
+    ("+91.0000+075.0000/", None),
+    ("+31.2508", None),
+    ("garbage", None),
+    ("", None),
+])
+def test_parse_iso6709(value, expected):
+    assert _parse_iso6709(value) == expected
+
+
+def test_iter_boxes_stops_at_truncated_box():
+    data = box(b'free', b'1234') + struct.pack('>I4s', 100, b'moov')
+    assert [box_type for box_type, _, _ in _iter_boxes(data, 0, len(data))] == [b'free']
+
+
+def test_iter_boxes_rejects_undersized_box():
+    data = struct.pack('>I4s', 4, b'moov') + b'\x00' * 16
+    assert list(_iter_boxes(data, 0, len(data))) == []
+
+
+def test_xyz_location(extractor):
+    video = mp4(box(b'udta', xyz_box("+31.2508+075.7054/")))
+    result = extractor.extract_metadata_coordinates(video)
+    assert (result["latitude"], result["longitude"]) == (31.2508, 75.7054)
+    assert result["source"] == "video_metadata"
+
+
+def test_apple_location_key(extractor):
+    video = mp4(apple_meta("+31.2508+075.7054+245.000/"))
+    result = extractor.extract_metadata_coordinates(video)
+    assert (result["latitude"], result["longitude"]) == (31.2508, 75.7054)
+
+
+def test_other_metadata_keys_are_ignored(extractor):
+    video = mp4(apple_meta("+31.2508+075.7054/", key=b'com.apple.quicktime.make'))
+    assert extractor.extract_metadata_coordinates(video) is None
+
+
+def test_no_moov(extractor):
+    assert extractor.extract_metadata_coordinates(box(b'ftyp', b'isom') + box(b'mdat')) is None
+
+
+def test_xyz_length_beyond_box(extractor):
+    payload = struct.pack('>HH', 0xFFFF, 0) + b"+31.2508+075.7054/"
+    assert extractor._find_location(mp4(box(b'udta', box(b'\xa9xyz', payload)))) == (31.2508, 75.7054)
+
+
+def test_truncated_xyz_box(extractor):
+    assert extractor.extract_metadata_coordinates(mp4(box(b'udta', box(b'\xa9xyz', b'\x00')))) is None
+
+
+def test_truncated_data_box(extractor):
+    keys = box(b'keys', struct.pack('>II', 0, 1) + struct.pack('>I4s', 8 + len(APPLE_LOCATION_KEY), b'mdta')
+               + APPLE_LOCATION_KEY)
+    ilst = box(b'ilst', box(struct.pack('>I', 1), box(b'data', b'\x00\x00')))
+    assert extractor.extract_metadata_coordinates(mp4(box(b'meta', box(b'hdlr', b'\x00' * 24) + keys + ilst))) is None
+
+
+@pytest.mark.parametrize("key_size", [0, 4, 0xFFFFFFFF])
+def test_hostile_keys_box_returns_quickly(extractor, key_size):
+    # Huge entry count with entries that never advance or overrun the box
+    keys = box(b'keys', struct.pack('>II', 0, 0xFFFFFFFF) + struct.pack('>I4s', key_size, b'mdta'))
+    video = mp4(box(b'meta', box(b'hdlr', b'\x00' * 24) + keys))
+
+    start = time.perf_counter()
+    assert extractor.extract_metadata_coordinates(video) is None
+    assert time.perf_counter() - start < 0.5
+
+
+def test_deeply_nested_containers(extractor):
+    nested = xyz_box("+31.2508+075.7054/")
+    for _ in range(10000):
+        nested = box(b'udta', nested)
+    assert extractor.extract_metadata_coordinates(mp4(nested)) is None
@@ -0,0 +1,70 @@
+"""ETag matching and conditional GET on the zone endpoints"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services.zone_cache import etag_matches, make_etag
+
+ETAG = '"0123456789abcdef"'
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    (ETAG, True),
+    ('"fedcba9876543210"', False),
+    (f"W/{ETAG}", True),
+    ("*", True),
+    (f'"fedcba9876543210", {ETAG}', True),
+    (f'"fedcba9876543210",W/{ETAG}', True),
+    ('"fedcba9876543210", W/"0000000000000000"', False),
+    (ETAG[1:-1], False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, ETAG) is expected
+
+
+def test_make_etag_is_quoted_and_content_based():
+    assert make_etag(b'{"a":1}') == make_etag(b'{"a":1}')
+    assert make_etag(b'{"a":1}') != make_etag(b'{"a":2}')
+    assert make_etag(b'{}').startswith('"') and make_etag(b'{}').endswith('"')
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def _assert_conditional_get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["x-zones-version"]
+    assert "max-age" in response.headers["cache-control"]
+
+    for header in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+        cached = client.get(url, headers={"If-None-Match": header})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+
+    stale = client.get(url, headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.content == response.content
+    return response
+
+
+def test_zone_list_conditional_get(client):
+    response = _assert_conditional_get(client, "/api/v1/zones")
+    assert response.json()["total_zones"] == len(response.json()["zones"])
+
+
+def test_zone_detail_conditional_get(client):
+    zone_id = client.get("/api/v1/zones").json()["zones"][0]["id"]
+    response = _assert_conditional_get(client, f"/api/v1/zones/{zone_id}")
+    assert response.json()["id"] == zone_id
+
+
+def test_unknown_zone_is_404(client):
+    assert client.get("/api/v1/zones/no_such_zone").status_code == 404
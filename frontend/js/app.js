@@ -21,6 +21,10 @@ const errorSection = document.getElementById('errorSection');
 const newValidationBtn = document.getElementById('newValidationBtn');
 const retryBtn = document.getElementById('retryBtn');
 const downloadBtn = document.getElementById('downloadBtn');
+const quickLat = document.getElementById('quickLat');
+const quickLon = document.getElementById('quickLon');
+const quickResult = document.getElementById('quickResult');
+const quickConfirmBtn = document.getElementById('quickConfirmBtn');
 
 // State
 let selectedFile = null;
@@ -64,6 +68,9 @@ validateBtn.addEventListener('click', validateImage);
 newValidationBtn.addEventListener('click', resetUI);
 retryBtn.addEventListener('click', resetUI);
 downloadBtn.addEventListener('click', downloadReport);
+quickLat.addEventListener('input', quickCheck);
+quickLon.addEventListener('input', quickCheck);
+quickConfirmBtn.addEventListener('click', confirmCoordinates);
 
 // ========================================
 // File Handling
@@ -73,8 +80,8 @@ function handleFileSelect(file) {
     // Validate file
     if (!file) return;
     
-    if (!file.type.startsWith('image/')) {
-        showError('Invalid file type', 'Please select an image file (JPG, PNG, WEBP)');
+    if (!file.type.startsWith('image/') && !file.type.startsWith('video/')) {
+        showError('Invalid file type', 'Please select an image (JPG, PNG, WEBP) or a short video (MP4, MOV)');
         return;
     }
     
@@ -89,6 +96,8 @@ function handleFileSelect(file) {
     const reader = new FileReader();
     reader.onload = (e) => {
         imagePreview.src = e.target.result;
+        // Videos can't be previewed in the <img> element
+        imagePreview.style.display = file.type.startsWith('video/') ? 'none' : '';
         fileName.textContent = file.name;
         fileSize.textContent = formatFileSize(file.size);
         
@@ -168,6 +177,81 @@ async function validateImage() {
     }
 }
 
+// ========================================
+// Quick Coordinate Check
+// ========================================
+
+function readQuickCoordinates() {
+    const lat = parseFloat(quickLat.value);
+    const lon = parseFloat(quickLon.value);
+    if (isNaN(lat) || isNaN(lon) || lat < -90 || lat > 90 || lon < -180 || lon > 180) {
+        return null;
+    }
+    return { lat, lon };
+}
+
+// Instant, preliminary answer from the local zone index (no round trip)
+function quickCheck() {
+    const coords = readQuickCoordinates();
+    quickConfirmBtn.disabled = !coords;
+    quickResult.className = 'quick-result';
+
+    if (!coords) {
+        quickResult.textContent = 'Enter coordinates for an instant check';
+        return;
+    }
+    if (!ZoneIndex.ready) {
+        quickResult.textContent = 'Zone data is loading - confirm with the server for a result';
+        return;
+    }
+
+    const chain = ZoneIndex.locate(coords.lat, coords.lon);
+    if (chain.length) {
+        quickResult.textContent = `Inside ${chain.map(zone => zone.name).join(' → ')} (preliminary)`;
+        quickResult.classList.add('inside');
+    } else {
+        quickResult.textContent = 'Outside all known zones (preliminary)';
+        quickResult.classList.add('outside');
+    }
+}
+
+// Authoritative check on the server
+async function confirmCoordinates() {
+    const coords = readQuickCoordinates();
+    if (!coords) return;
+
+    quickConfirmBtn.disabled = true;
+    try {
+        const params = new URLSearchParams({ latitude: coords.lat, longitude: coords.lon });
+        const response = await fetch(`${API_BASE_URL}/api/v1/validate-coordinates?${params}`, {
+            method: 'POST'
+        });
+        const data = await response.json();
+
+        if (!response.ok) {
+            throw new Error(data.detail || 'Validation failed');
+        }
+
+        displayResults({
+            extracted_gps: {
+                latitude: coords.lat,
+                longitude: coords.lon,
+                source: 'manual',
+                confidence: 1
+            },
+            validation: data.validation
+        });
+
+        // Keep the local index in step with the server's zone data
+        ZoneIndex.ensureVersion(data.zones_version).then(quickCheck);
+    } catch (error) {
+        console.error('Coordinate validation error:', error);
+        showError('Connection Error', 'Failed to confirm coordinates with the server. Please try again.');
+    } finally {
+        quickConfirmBtn.disabled = false;
+    }
+}
+
 // ========================================
 // Display Results
 // ========================================
@@ -218,6 +302,9 @@ function displayResults(data) {
 function formatSource(source) {
     const sourceMap = {
         'exif': 'EXIF Metadata',
+        'manual': 'Manual Entry',
+        'video_metadata': 'Video Metadata',
+        'video_ocr': 'Video Frame OCR',
         'ocr': 'OCR Text Extraction',
         'pattern_recognition': 'Pattern Recognition',
         'whatsapp_pattern': 'WhatsApp GPS Overlay'
@@ -287,7 +374,7 @@ function downloadReport() {
     if (!validationResults) return;
     
     const report = {
-        filename: selectedFile.name,
+        filename: selectedFile ? selectedFile.name : null,
         timestamp: new Date().toISOString(),
         gps_coordinates: validationResults.extracted_gps,
         validation: validationResults.validation
@@ -322,5 +409,7 @@ document.querySelectorAll('a[href^="#"]').forEach(anchor => {
 // Initialize
 // ========================================
 
+ZoneIndex.load().then(quickCheck);
+
 console.log('GPS Verifier UI initialized');
 console.log('API Endpoint:', API_ENDPOINT);
@@ -0,0 +1,132 @@
+// ========================================
+// GPS Verifier - Client-side Zone Index
+// ========================================
+//
+// Downloads the compact zone index (/api/v1/zones/index) once, caches it in
+// localStorage and answers point-in-zone queries in the browser for instant
+// feedback. The cached copy is revalidated with its ETag, so the full index
+// is only downloaded again when the zone dataset version changes. Results
+// are preliminary; the server stays authoritative.
+
+const ZoneIndex = (() => {
+    const STORAGE_KEY = 'gps-verifier-zone-index';
+    const INDEX_URL = `${window.location.origin}/api/v1/zones/index`;
+
+    let zones = [];
+    let version = null;
+    let loading = null;
+
+    // Decode delta-encoded, quantized rings into [lat, lon] float arrays
+    function decode(data) {
+        const scale = data.scale;
+        return data.zones.map(zone => ({
+            id: zone.id,
+            name: zone.name,
+            type: zone.type,
+            parent: zone.parent,
+            bbox: zone.bbox.map(v => v / scale),
+            rings: zone.rings.map(flat => {
+                const ring = [];
+                let lat = 0;
+                let lon = 0;
+                for (let i = 0; i < flat.length; i += 2) {
+                    lat += flat[i];
+                    lon += flat[i + 1];
+                    ring.push([lat / scale, lon / scale]);
+                }
+                return ring;
+            })
+        }));
+    }
+
+    function readCache() {
+        try {
+            return JSON.parse(localStorage.getItem(STORAGE_KEY) || 'null');
+        } catch (e) {
+            return null;
+        }
+    }
+
+    function writeCache(etag, data) {
+        try {
+            localStorage.setItem(STORAGE_KEY, JSON.stringify({ etag, data }));
+        } catch (e) {
+            // Storage full or disabled - the in-memory copy still works
+        }
+    }
+
+    function apply(data) {
+        zones = decode(data);
+        version = data.version;
+    }
+
+    // Load the index: cached copy first, then a conditional request
+    async function load() {
+        if (loading) return loading;
+
+        loading = (async () => {
+            const cached = readCache();
+            if (cached) apply(cached.data);
+
+            try {
+                const headers = cached && cached.etag ? { 'If-None-Match': cached.etag } : {};
+                const response = await fetch(INDEX_URL, { headers });
+
+                if (response.status === 200) {
+                    const data = await response.json();
+                    writeCache(response.headers.get('ETag'), data);
+                    apply(data);
+                }
+                // 304: cached copy is current
+            } catch (error) {
+                console.warn('Zone index refresh failed, using cached copy:', error);
+            }
+            return version;
+        })();
+
+        try {
+            return await loading;
+        } finally {
+            loading = null;
+        }
+    }
+
+    // Re-fetch only if the server reports a different dataset version
+    async function ensureVersion(serverVersion) {
+        if (serverVersion && serverVersion !== version) {
+            await load();
+        }
+    }
+
+    // Even-odd ray casting over all rings (holes included)
+    function containsPoint(zone, lat, lon) {
+        const [minLat, minLon, maxLat, maxLon] = zone.bbox;
+        if (lat < minLat || lat > maxLat || lon < minLon || lon > maxLon) return false;
+
+        let inside = false;
+        for (const ring of zone.rings) {
+            for (let i = 0, j = ring.length - 1; i < ring.length; j = i++) {
+                const [latI, lonI] = ring[i];
+                const [latJ, lonJ] = ring[j];
+                if ((latI > lat) !== (latJ > lat) &&
+                    lon < (lonJ - lonI) * (lat - latI) / (latJ - latI) + lonI) {
+                    inside = !inside;
+                }
+            }
+        }
+        return inside;
+    }
+
+    // All zones containing the point, most specific first (same order as the server)
+    function locate(lat, lon) {
+        return zones.filter(zone => containsPoint(zone, lat, lon));
+    }
+
+    return {
+        load,
+        ensureVersion,
+        locate,
+        get version() { return version; },
+        get ready() { return zones.length > 0; }
+    };
+})();